@@ -110,12 +110,17 @@ def determine_verdict(stdout: str, stderr: str) -> Dict[str, object]:
     }
 
 
+# -- Role helpers --
+_OPPOSITE_ROLE = {"server": "client", "client": "server"}
+
+
 def oppose_role(role: str) -> str:
     """Return the opposite role.
 
     When testing a server IUT, Ivy acts as client (and vice versa).
+    Anything other than "server" maps to "server".
     """
-    return "client" if role == "server" else "server"
+    return _OPPOSITE_ROLE.get(role, "server")
 
 
 def detect_role(test_name: str) -> str:
@@ -1,13 +1,36 @@
 import argparse
+import functools
 import os
 import platform
+import shlex
 import shutil
+import signal
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
 
 ROOT = Path.cwd()  # Current working directory
 SUBMOD, IVY = ROOT / "submodules", ROOT / "ivy"
+SYSTEM = platform.system()  # resolved once for the per-OS build branches
+IS_WINDOWS, IS_DARWIN = SYSTEM == "Windows", SYSTEM == "Darwin"
+
+
+@functools.cache
+def _tool_available(tool: str) -> bool:
+    """Return whether ``tool`` is on PATH; each tool is looked up once."""
+    return shutil.which(tool) is not None
+
+
+def _require_tools(*tools):
+    """Exit with a clear message unless every tool in ``tools`` is on PATH."""
+    for tool in tools:
+        if not _tool_available(tool):
+            sys.exit(f"Z3_BUILD_MODE={Z3_BUILD_MODE} requires '{tool}' on PATH")
 
 
 def detect_openssl_prefix() -> str:
@@ -26,7 +49,7 @@ def detect_openssl_prefix() -> str:
         return env_prefix
 
     # 2. Homebrew (macOS)
-    if shutil.which("brew"):
+    if _tool_available("brew"):
         try:
             result = subprocess.run(
                 ["brew", "--prefix", "openssl"],
@@ -43,7 +66,7 @@ def detect_openssl_prefix() -> str:
             pass
 
     # 3. pkg-config (Linux)
-    if shutil.which("pkg-config"):
+    if _tool_available("pkg-config"):
         try:
             result = subprocess.run(
                 ["pkg-config", "--variable=prefix", "openssl"],
@@ -79,7 +102,11 @@ def detect_openssl_prefix() -> str:
 
 
 # ─────────── Build-mode table ───────────
-MODES: dict[str, dict[str, object]] = {
+# Extra ASan checks that cost little at run time: scope-exit use-after-free
+# detection and complete stack traces.
+_ASAN_FLAGS = "-fsanitize-address-use-after-scope -fno-optimize-sibling-calls"
+
+_MODE_TABLE: dict[str, dict[str, object]] = {
     "": {"cmake": [], "static": False},  # shadow/original
     "debug-asan": {
         "cmake": [
@@ -88,6 +115,22 @@ MODES: dict[str, dict[str, object]] = {
             "-DINCLUDE_GIT_HASH=FALSE",
             "-DINCLUDE_GIT_DESCRIBE=FALSE",
             "-DBUILD_LIBZ3_SHARED=FALSE",
+            f"-DCMAKE_C_FLAGS={_ASAN_FLAGS}",
+            f"-DCMAKE_CXX_FLAGS={_ASAN_FLAGS}",
+        ],
+        "static": False,
+    },
+    # debug-asan plus libstdc++ debug containers; _GLIBCXX_DEBUG changes the
+    # ABI, so everything linked against this libz3 must be built with it too.
+    "debug-asan-stl": {
+        "cmake": [
+            "-DCMAKE_BUILD_TYPE=Debug",
+            "-DSANITIZE_ADDRESS=TRUE",
+            "-DINCLUDE_GIT_HASH=FALSE",
+            "-DINCLUDE_GIT_DESCRIBE=FALSE",
+            "-DBUILD_LIBZ3_SHARED=FALSE",
+            f"-DCMAKE_C_FLAGS={_ASAN_FLAGS}",
+            f"-DCMAKE_CXX_FLAGS={_ASAN_FLAGS} -D_GLIBCXX_DEBUG",
         ],
         "static": False,
     },
@@ -103,6 +146,19 @@ MODES: dict[str, dict[str, object]] = {
         ],
         "static": False,
     },
+    # Parallel LTO: clang ThinLTO when clang/lld are available, else gcc's
+    # partitioned -flto=<jobs>; see _thin_lto_build. libz3 is shared so the
+    # LTO happens here and Ivy links plain machine code with any toolchain.
+    "release-thin-lto": {
+        "cmake": [
+            "-DCMAKE_BUILD_TYPE=Release",
+            "-DINCLUDE_GIT_HASH=FALSE",
+            "-DINCLUDE_GIT_DESCRIBE=FALSE",
+            "-DBUILD_LIBZ3_SHARED=TRUE",
+        ],
+        "static": False,
+        "lto": "thin",
+    },
     "release-static-pgo": {
         "cmake": [
             "-DCMAKE_BUILD_TYPE=Release",
@@ -116,62 +172,268 @@ MODES: dict[str, dict[str, object]] = {
         ],
         "static": True,
     },
+    "release-bolt": {
+        "cmake": [
+            "-DCMAKE_BUILD_TYPE=Release",
+            "-DLINK_TIME_OPTIMIZATION=TRUE",
+            "-DINCLUDE_GIT_HASH=FALSE",
+            "-DINCLUDE_GIT_DESCRIBE=FALSE",
+            "-DBUILD_LIBZ3_SHARED=TRUE",
+            "-DCMAKE_C_FLAGS=-fprofile-use",
+            "-DCMAKE_CXX_FLAGS=-fprofile-use",
+            "-DCMAKE_SHARED_LINKER_FLAGS=-Wl,--emit-relocs",
+            "-DCMAKE_EXE_LINKER_FLAGS=-Wl,--emit-relocs",
+        ],
+        "static": False,
+        "bolt": True,  # post-link libz3.so optimization, see _bolt_optimize
+    },
+    "release-cs-pgo": {
+        "cmake": [
+            "-DCMAKE_BUILD_TYPE=Release",
+            "-DINCLUDE_GIT_HASH=FALSE",
+            "-DINCLUDE_GIT_DESCRIBE=FALSE",
+            "-DBUILD_LIBZ3_SHARED=FALSE",
+            "-DCMAKE_POSITION_INDEPENDENT_CODE=FALSE",
+        ],
+        "static": True,
+        "pgo": "cs",  # clang context-sensitive PGO, see build_z3_with_pgo
+    },
 }
 
+# Read-only view of the table: modes can't be mutated by accident and the
+# cmake option tuples are shared rather than copied by each consumer.
+MODES: Mapping[str, Mapping[str, object]] = MappingProxyType(
+    {
+        name: MappingProxyType({**cfg, "cmake": tuple(cfg["cmake"])})
+        for name, cfg in _MODE_TABLE.items()
+    }
+)
+
 BUILD_MODE = os.getenv("BUILD_MODE", "")
 Z3_BUILD_MODE = os.getenv("Z3_BUILD_MODE", BUILD_MODE)
 if Z3_BUILD_MODE not in MODES:
     sys.exit(f"Unknown Z3_BUILD_MODE='{Z3_BUILD_MODE}'; choose one of {list(MODES)}")
-
-
-def do_cmd(cmd):
+Z3_MODE = MODES[Z3_BUILD_MODE]  # active build-mode config, resolved once
+
+# Parallel make jobs; BUILD_JOBS=1 throttles builds (e.g. under emulation,
+# where make's job-server pipes have been unreliable).
+BUILD_JOBS = os.getenv("BUILD_JOBS") or str(os.cpu_count() or 2)
+if not BUILD_JOBS.isdecimal() or int(BUILD_JOBS) < 1:
+    sys.exit(f"Invalid BUILD_JOBS='{BUILD_JOBS}'; expected a positive integer")
+
+# Modes whose static archives hold gcc LTO bitcode (need gcc-ar/gcc-ranlib)
+LTO_MODES = ("rel-lto", "release-thin-lto", "release-static-pgo", "release-bolt")
+RUN_CMD_TAIL_LINES = 200  # output lines repeated when a command fails
+BOLT_FLAGS = (
+    "--reorder-blocks=ext-tsp",
+    "--reorder-functions=hfsort+",
+    "--split-functions",
+    "--icf=1",
+    "--use-gnu-stack",
+)
+CCACHE_SLOPPINESS = "pch_defines,time_macros,locale"  # unless set by the user
+BUILD_STAMP = ".panther_build"  # mode + Z3 commit of the last successful build
+CONFIGURE_STAMP = ".panther_configure"  # last CMake command run in a build dir
+PGO_DIR = ROOT / "build" / "pgo"  # gcc .gcda files, clang cs-pgo cache by commit
+FICLONE = 0x40049409  # linux/fs.h ioctl sharing a file's extents (reflink)
+_CHAIN = threading.local()  # make job share and output tag of a parallel chain
+_SESSIONS = set()  # run_cmd children, each running in its own session
+
+
+def do_cmd(cmd, cwd=None):
     print(cmd)
-    if status := os.system(cmd):
+    # Echo the output through print() so run_parallel can tag its lines
+    with subprocess.Popen(
+        cmd,
+        shell=True,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as proc:
+        for line in proc.stdout:
+            print(line, end="")
+    if status := proc.returncode:
         exit(status)
 
 
-def run_cmd(cmd, cwd=None):
+def run_cmd(cmd, cwd=None, timeout=1800, env=None):
+    """Run ``cmd``, streaming its output, and exit on failure or timeout.
+
+    stdout and stderr are merged and echoed line by line so long builds log
+    live without buffering their whole output in memory; only the last
+    ``RUN_CMD_TAIL_LINES`` lines are kept to repeat in the failure report.
+    ``env`` holds overrides applied on top of the current environment.
+    """
     print(cmd if isinstance(cmd, str) else " ".join(cmd))
     print(f"Running in directory: {cwd if cwd else 'current directory'}")
+    if env:
+        print(f"Environment overrides: {env}")
+    tail = deque(maxlen=RUN_CMD_TAIL_LINES)
+    timed_out = threading.Event()
     try:
-        result = subprocess.run(
+        with subprocess.Popen(
             cmd,
             shell=isinstance(cmd, str),
             cwd=cwd,
-            capture_output=True,
+            env={**os.environ, **env} if env else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=1800,  # 30 minute timeout (TODO: make configurable)
-        )
-
-        # Always print stdout for visibility
-        if result.stdout:
-            print(f"STDOUT:\n{result.stdout}")
-
-        # Print stderr and exit on failure
-        if result.returncode != 0:
-            print(f"ERROR: Command failed with return code {result.returncode}")
-            if result.stderr:
-                print(f"STDERR:\n{result.stderr}")
-            sys.exit(result.returncode)
-
-    except subprocess.TimeoutExpired:
-        print(f"ERROR: Command timed out after 30 minutes")
-        sys.exit(1)
+            bufsize=1,
+            start_new_session=not IS_WINDOWS,
+        ) as proc:
+
+            def kill_on_timeout():
+                timed_out.set()
+                _kill_session(proc)
+
+            watchdog = threading.Timer(timeout, kill_on_timeout)
+            watchdog.start()
+            _SESSIONS.add(proc)
+            try:
+                for line in proc.stdout:
+                    print(line, end="")
+                    tail.append(line)
+                returncode = proc.wait()
+            except BaseException:
+                # The child's own session doesn't get the terminal's Ctrl-C;
+                # stop it here rather than leave the build running orphaned
+                _kill_session(proc)
+                raise
+            finally:
+                watchdog.cancel()
+                _SESSIONS.discard(proc)
     except Exception as e:
         print(f"ERROR: Command execution failed: {e}")
         sys.exit(1)
 
+    if timed_out.is_set():
+        print(f"ERROR: Command timed out after {timeout} seconds")
+        sys.exit(1)
+    if returncode != 0:
+        print(f"ERROR: Command failed with return code {returncode}")
+        if tail:
+            print(f"Last {len(tail)} lines of output:\n{''.join(tail)}")
+        sys.exit(returncode)
+
+
+def _kill_session(proc):
+    """Kill ``proc`` and, outside Windows, every process in its session.
+
+    With shell=True ``proc`` is only /bin/sh; make and the compilers it
+    started must die too, or they keep running and hold the output pipe.
+    """
+    if IS_WINDOWS:
+        proc.kill()
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
 
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
 
 
 def make_dir_exist(dir):
-    if not os.path.exists(dir):
+    try:
         os.mkdir(dir)
-    elif not os.path.isdir(dir):
-        print(f"cannot create directory {dir}")
-        exit(1)
+    except FileExistsError:  # may race with a concurrent install step
+        if not os.path.isdir(dir):
+            print(f"cannot create directory {dir}")
+            exit(1)
+
+
+def _make_jobs():
+    """Return the make and LTO job count for the calling thread's build chain."""
+    return getattr(_CHAIN, "jobs", BUILD_JOBS)
+
+
+class _ChainOutput:
+    """``sys.stdout`` stand-in that prefixes each line with its chain's tag.
+
+    Lines are assembled per thread and written whole, so output of chains
+    running side by side stays readable; untagged threads write through.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        tag = getattr(_CHAIN, "tag", None)
+        if tag is None:
+            return self.stream.write(text)
+        *lines, _CHAIN.partial = (_CHAIN.partial + text).split("\n")
+        if lines:
+            with self._lock:
+                self.stream.write("".join(f"[{tag}] {line}\n" for line in lines))
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def run_parallel(*chains):
+    """Run independent build chains concurrently.
+
+    Each chain is a sequence of steps run in order on its own thread; the
+    first failure (``sys.exit`` inside a step) is re-raised here once the
+    other chains have finished. ``BUILD_JOBS`` is split between the chains
+    so their makes don't oversubscribe the machine together, and each output
+    line is prefixed with its chain, e.g. ``[z3]``. With fewer jobs than
+    chains they run one after another instead, so ``BUILD_JOBS=1`` keeps the
+    whole build serial.
+
+    On Ctrl-C the running commands are killed (their sessions don't get the
+    terminal's signal) and no chain starts another step.
+    """
+    jobs, extra = divmod(int(BUILD_JOBS), len(chains))
+    if not jobs:
+        for chain in chains:
+            for step in chain:
+                step()
+        return
+
+    output = _ChainOutput(sys.stdout)
+    interrupted = threading.Event()
+
+    def run_chain(chain, share):
+        _CHAIN.jobs = str(share)
+        _CHAIN.tag = chain[0].__name__.removeprefix("build_")
+        _CHAIN.partial = ""
+        try:
+            for step in chain:
+                if interrupted.is_set():
+                    break
+                step()
+        finally:
+            if _CHAIN.partial:
+                output.write("\n")
+
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(chains)) as pool:
+            futures = [
+                pool.submit(run_chain, chain, jobs + (i < extra))
+                for i, chain in enumerate(chains)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                interrupted.set()
+                for proc in list(_SESSIONS):
+                    _kill_session(proc)
+                raise
+    finally:
+        sys.stdout = output.stream
 
 
 def find_vs():
@@ -210,13 +472,86 @@ def build_z3():
     if not z3.exists():
         sys.exit("submodules/z3 missing (git submodule update --init)")
 
-    if BUILD_MODE in MODES and BUILD_MODE != "":
-        print(f"Using CMake for Z3 build with BUILD_MODE={BUILD_MODE}")
+    stamp = z3 / "build" / BUILD_STAMP
+    build_id = _z3_build_id(z3)
+    if _z3_up_to_date(stamp, build_id):
+        print(f"Z3 up-to-date for Z3_BUILD_MODE='{Z3_BUILD_MODE}', skipping build")
+        return
+
+    if Z3_BUILD_MODE:
+        print(f"Using CMake for Z3 build with Z3_BUILD_MODE={Z3_BUILD_MODE}")
         optimized_build_for_ivy_test_target(z3)
     else:
-        print(f"Using legacy build for BUILD_MODE='{BUILD_MODE}'")
+        print(f"Using legacy build for Z3_BUILD_MODE='{Z3_BUILD_MODE}'")
         legacy_build(z3)
 
+    if build_id is not None:
+        stamp.write_text(build_id)
+
+
+def _z3_build_id(z3):
+    """Identify what a Z3 build is made of.
+
+    That is the mode and its CMake options, the commit, the host tuning and,
+    for ``-fprofile-use`` modes, the profile path and its newest mtime.
+    Returns None when the commit can't be pinned down (see _z3_revision).
+    """
+    rev = _z3_revision(z3)
+    if rev is None:
+        return None
+    host = os.getenv("BUILD_FOR_HOST", "")
+    cmake_opts = " ".join(Z3_MODE["cmake"])
+    profile = ""
+    if any("-fprofile-use" in opt for opt in Z3_MODE["cmake"]):
+        if (path := _resolve_profile_path()) is not None:
+            profile = f"{path} {_newest_mtime_ns(path)}"
+    return f"{Z3_BUILD_MODE}\n{rev}\n{host}\n{cmake_opts}\n{profile}\n"
+
+
+def _z3_revision(z3):
+    """Return the commit ``z3`` is checked out at, or None.
+
+    None means ``z3`` is not a git checkout or ``src/`` has uncommitted
+    changes. ``git diff --quiet HEAD`` compares the working tree, staged or
+    not, against the commit; git's stat cache keeps it from re-reading
+    unchanged files.
+    """
+    try:
+        rev = subprocess.run(
+            ["git", "-C", str(z3), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        if rev.returncode != 0:
+            return None
+        dirty = subprocess.run(
+            ["git", "-C", str(z3), "diff", "--quiet", "HEAD", "--", "src/"],
+            timeout=120,
+        ).returncode
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if dirty:
+        return None
+    return rev.stdout.strip()
+
+
+def _newest_mtime_ns(path):
+    """Return the newest mtime under ``path``, a file or a directory tree."""
+    mtimes = [path.stat().st_mtime_ns]
+    if path.is_dir():
+        mtimes += (p.stat().st_mtime_ns for p in path.rglob("*"))
+    return max(mtimes)
+
+
+def _z3_up_to_date(stamp, build_id):
+    """Return whether the installed libz3 was built from ``build_id``."""
+    if build_id is None or os.getenv("Z3_CLEAN_BUILD", "0") == "1":
+        return False
+    if not any((ROOT / "lib").glob("libz3.*")):
+        return False
+    return stamp.exists() and stamp.read_text() == build_id
+
 
 def legacy_build(z3):
     # Use legacy mk_make.py method for original/Shadow compatibility
@@ -224,27 +559,29 @@ def legacy_build(z3):
     cmd = (
         f"python3 scripts/mk_make.py --python --prefix {str(ROOT)} --pypkgdir {str(IVY)}"
         # f'python3 scripts/mk_make.py --prefix {str(ROOT)}'
-        if platform.system() != "Windows"
+        if not IS_WINDOWS
         else f"python3 scripts/mk_make.py -x --python --pypkgdir {str(IVY)}"
     )
     run_cmd(cmd, cwd=str(z3))
 
     build_dir = str(z3 / "build")
 
-    if platform.system() == "Windows":
-        run_cmd(f'"{find_vs()}" & nmake', cwd=build_dir)
+    if IS_WINDOWS:
+        # nmake is serial; /MP lets cl.exe compile its batches in parallel
+        run_cmd(f'"{find_vs()}" & set CL=/MP & nmake', cwd=build_dir)
     else:
-        run_cmd("make -j 4", cwd=build_dir)
+        run_cmd(f"make -j {_make_jobs()}", cwd=build_dir)
         run_cmd("make install", cwd=build_dir)
 
 
 def optimized_build_for_ivy_test_target(z3):
     import shutil
 
-    cfg = MODES[BUILD_MODE]
+    cfg = Z3_MODE
     build_dir = z3 / "build"
     print(
-        f"Using CMake for Z3 build with BUILD_MODE={BUILD_MODE} and configuration: {cfg}"
+        f"Using CMake for Z3 build with Z3_BUILD_MODE={Z3_BUILD_MODE} "
+        f"and configuration: {dict(cfg)}"
     )
     print(f"Build directory: {build_dir}")
     # Allow incremental builds by default (critical for Docker cache mounts).
@@ -255,19 +592,86 @@ def optimized_build_for_ivy_test_target(z3):
 
     ensure_dir(build_dir)
 
-    cmake_cmd = "CC=gcc CXX=g++ "
-    cmake_cmd += "cmake "
+    if cfg.get("pgo") == "cs":
+        build_z3_with_pgo(z3, cfg)
+    elif cfg.get("lto") == "thin":
+        _thin_lto_build(build_dir, cfg)
+    else:
+        _gcc_cmake_build(build_dir, cfg)
+
+    if cfg.get("bolt"):
+        _bolt_optimize(z3, build_dir)
+
+    build_dir = str(build_dir)
+
+    # Install Z3 (installs libs, headers, and Python bindings)
+    run_cmd("make install", cwd=build_dir)
+
+    # stage artefacts into ivy/
+    ensure_dir(IVY / "lib")
+    ensure_dir(IVY / "include")
+    for hdr in (ROOT / "include").glob("z3*.h"):
+        _fast_install(hdr, IVY / "include" / hdr.name)
+
+    if cfg["static"]:
+        _fast_install(ROOT / "lib/libz3.a", IVY / "lib/libz3.a")
+    else:
+        for so in (ROOT / "lib").glob("libz3.*"):
+            _fast_install(so, IVY / "lib" / so.name)
+
+
+def _fast_install(src, dst):
+    """Install ``src`` at ``dst`` by reflink, falling back to a copy.
+
+    Never hardlinks: ``dst`` gets its own inode, so rewriting the build
+    tree can't change an installed file behind its back. Nothing is done
+    when ``dst`` already has the size and mtime of ``src`` (both are copied
+    along), so incremental builds don't rewrite an unchanged libz3.
+    """
+    src, dst = Path(src), Path(dst)
+    if dst.exists():
+        src_st, dst_st = src.stat(), dst.stat()
+        if (
+            not dst.samefile(src)
+            and src_st.st_size == dst_st.st_size
+            and src_st.st_mtime_ns == dst_st.st_mtime_ns
+        ):
+            return
+        dst.unlink()
+
+    try:
+        import fcntl
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return
+    except (ImportError, OSError):
+        pass  # no fcntl (Windows) or no reflink support, copy instead
+
+    shutil.copy2(src, dst)
+
+
+def _gcc_cmake_build(build_dir, cfg, flags=""):
+    env = _cmake_env("gcc", "g++")
+    cmake_cmd = "cmake "
     cmake_cmd += '-G "Unix Makefiles" '
     cmake_cmd += f"-DCMAKE_INSTALL_PREFIX={ROOT}"
 
     # For LTO builds, use gcc-ar/gcc-ranlib/gcc-nm which understand LTO bitcode
-    if BUILD_MODE in ("rel-lto", "release-static-pgo"):
+    if Z3_BUILD_MODE in LTO_MODES:
         cmake_cmd += " -DCMAKE_AR=/usr/bin/gcc-ar"
         cmake_cmd += " -DCMAKE_RANLIB=/usr/bin/gcc-ranlib"
         cmake_cmd += " -DCMAKE_NM=/usr/bin/gcc-nm"
 
-    for opt in cfg["cmake"]:
-        cmake_cmd += f" {opt}"
+    cmake_opts = _resolve_profile_flags(cfg["cmake"])
+    if arch := _host_arch_flag(cmake_opts):
+        flags = f"{flags} {arch}".strip()
+    if flags:
+        cmake_opts = _append_compile_flags(cmake_opts, flags)
+    cmake_opts = [*cmake_opts, *_compiler_launcher_opts(cmake_opts)]
+    for opt in cmake_opts:
+        cmake_cmd += f" {shlex.quote(opt)}"
 
     cmake_cmd += " ../"
 
@@ -275,27 +679,308 @@ def optimized_build_for_ivy_test_target(z3):
 
     print(f"Running CMake command: {cmake_cmd} in {build_dir}")
 
-    run_cmd(cmake_cmd, cwd=build_dir)
+    _cmake_configure(cmake_cmd, build_dir, env)
     # run_cmd("cmake --build . -j 4", cwd=build_dir)
     # run_cmd("cmake --install .", cwd=build_dir)
-    run_cmd(
-        "CC=gcc CXX=g++ make -j 1", cwd=build_dir
-    )  # job-server FD problem. (emulation ?)
+    run_cmd(f"make -j {_make_jobs()}", cwd=build_dir, env=env)
 
-    # Install Z3 (installs libs, headers, and Python bindings)
-    run_cmd("make install", cwd=build_dir)
 
-    # stage artefacts into ivy/
-    ensure_dir(IVY / "lib")
-    ensure_dir(IVY / "include")
-    for hdr in (ROOT / "include").glob("z3*.h"):
-        shutil.copy2(hdr, IVY / "include" / hdr.name)
+def _thin_lto_build(build_dir, cfg):
+    """Build with link-time optimization parallelized across the chain's jobs.
 
-    if cfg["static"]:
-        shutil.copy2(ROOT / "lib/libz3.a", IVY / "lib/libz3.a")
+    clang ThinLTO (linked by lld) is used when the LLVM tools are on PATH,
+    otherwise gcc's partitioned ``-flto=<jobs>``.
+    """
+    llvm_tools = ("clang", "clang++", "ld.lld", "llvm-ar", "llvm-ranlib")
+    if all(map(_tool_available, llvm_tools)):
+        print("Using clang ThinLTO")
+        linker_flags = f"-fuse-ld=lld -Wl,--thinlto-jobs={_make_jobs()}"
+        _clang_cmake_build(
+            build_dir,
+            cfg,
+            "-flto=thin",
+            extra_opts=(
+                f"-DCMAKE_AR={shutil.which('llvm-ar')}",
+                f"-DCMAKE_RANLIB={shutil.which('llvm-ranlib')}",
+                f"-DCMAKE_EXE_LINKER_FLAGS={linker_flags}",
+                f"-DCMAKE_SHARED_LINKER_FLAGS={linker_flags}",
+            ),
+        )
     else:
-        for so in (ROOT / "lib").glob("libz3.*"):
-            shutil.copy2(so, IVY / "lib" / so.name)
+        print("clang/lld not found, using gcc parallel LTO")
+        _gcc_cmake_build(build_dir, cfg, f"-flto={_make_jobs()}")
+
+
+def _cmake_env(cc, cxx):
+    """Return the environment overrides for a Z3 CMake build."""
+    return {
+        "CC": cc,
+        "CXX": cxx,
+        "CCACHE_SLOPPINESS": os.getenv("CCACHE_SLOPPINESS", CCACHE_SLOPPINESS),
+    }
+
+
+def _compiler_launcher_opts(cmake_opts):
+    """Return CMake options routing compiles through sccache or ccache.
+
+    Profile-guided builds are left alone: their results depend on profile
+    data that the compiler caches don't key on reliably.
+    """
+    if any("-fprofile" in opt for opt in cmake_opts):
+        return []
+    launcher = next(
+        (tool for tool in ("sccache", "ccache") if _tool_available(tool)), None
+    )
+    if launcher is None:
+        return []
+
+    print(f"Using compiler launcher: {launcher}")
+    return [
+        f"-DCMAKE_C_COMPILER_LAUNCHER={launcher}",
+        f"-DCMAKE_CXX_COMPILER_LAUNCHER={launcher}",
+    ]
+
+
+def _host_arch_flag(cmake_opts):
+    """Return ``-march=native`` for release builds when BUILD_FOR_HOST=1.
+
+    Builds are portable by default: images built here may run on older
+    CPUs than the build machine, where native code would die with SIGILL.
+    """
+    if os.getenv("BUILD_FOR_HOST") != "1":
+        return ""
+    if "-DCMAKE_BUILD_TYPE=Release" not in cmake_opts:
+        return ""
+    print("BUILD_FOR_HOST=1: tuning Z3 for this machine (-march=native)")
+    return "-march=native"
+
+
+def _append_compile_flags(cmake_opts, extra):
+    """Return ``cmake_opts`` with ``extra`` appended to CMAKE_C/CXX_FLAGS."""
+    cmake_opts = list(cmake_opts)
+    for prefix in ("-DCMAKE_C_FLAGS=", "-DCMAKE_CXX_FLAGS="):
+        for i, opt in enumerate(cmake_opts):
+            if opt.startswith(prefix):
+                cmake_opts[i] = f"{opt} {extra}"
+                break
+        else:
+            cmake_opts.append(f"{prefix}{extra}")
+    return cmake_opts
+
+
+def _resolve_profile_path():
+    """Return the gcc PGO profile for ``-fprofile-use``, or None if absent.
+
+    ``BUILD_PGO_PROFILE`` overrides the default ``build/pgo/gcc`` directory
+    of ``.gcda`` files.
+    """
+    path = Path(os.getenv("BUILD_PGO_PROFILE", PGO_DIR / "gcc"))
+    return path if path.exists() else None
+
+
+def _resolve_profile_flags(cmake_opts):
+    """Point ``-fprofile-use`` at an existing profile, or drop it."""
+    if not any("-fprofile-use" in opt for opt in cmake_opts):
+        return cmake_opts
+
+    profile = _resolve_profile_path()
+    if profile:
+        print(f"Using PGO profile: {profile}")
+        replacement = f"-fprofile-use={profile}"
+    else:
+        print(
+            "WARNING: no PGO profile found (set BUILD_PGO_PROFILE); "
+            "building without -fprofile-use"
+        )
+        replacement = ""
+    return [opt.replace("-fprofile-use", replacement) for opt in cmake_opts]
+
+
+def build_z3_with_pgo(z3, cfg):
+    """Build Z3 with clang context-sensitive PGO (three builds).
+
+    Stage 1 instruments with ``-fprofile-generate`` and trains the ``z3``
+    binary, stage 2 rebuilds on that profile with ``-fcs-profile-generate``
+    and trains again, stage 3 builds with ``-fprofile-use`` on the merged
+    profile. The merged profile is cached per Z3 commit in
+    ``build/pgo/cs/<commit>/profile.profdata`` so later builds of that commit
+    go straight to stage 3. Profiles of other commits, of a modified
+    checkout, or any profile under ``Z3_CLEAN_BUILD=1`` are discarded.
+    """
+    _require_tools("clang", "clang++", "llvm-profdata")
+
+    build_dir = z3 / "build"
+    rev = _z3_revision(z3)
+    cs_dir = PGO_DIR / "cs"
+    pgo_dir = cs_dir / (rev or "uncommitted")
+    discard = rev is None or os.getenv("Z3_CLEAN_BUILD", "0") == "1"
+    if cs_dir.exists():
+        for cached in cs_dir.iterdir():
+            if discard or cached != pgo_dir:
+                shutil.rmtree(cached, ignore_errors=True)
+    ensure_dir(pgo_dir)
+    profile = pgo_dir / "profile.profdata"
+
+    if profile.exists():
+        print(f"Reusing cached PGO profile {profile}")
+    else:
+        stage1_dir, stage2_dir = pgo_dir / "stage1", pgo_dir / "stage2"
+        stage1_profile = pgo_dir / "stage1.profdata"
+        for raw_dir in (stage1_dir, stage2_dir):
+            shutil.rmtree(raw_dir, ignore_errors=True)
+            ensure_dir(raw_dir)
+
+        print("PGO stage 1/3: context-free instrumentation")
+        _clang_cmake_build(build_dir, cfg, f"-fprofile-generate={stage1_dir}")
+        _run_pgo_training(z3, build_dir)
+        _merge_profiles(stage1_profile, stage1_dir.glob("*.profraw"))
+
+        print("PGO stage 2/3: context-sensitive instrumentation")
+        _clang_cmake_build(
+            build_dir,
+            cfg,
+            f"-fprofile-use={stage1_profile} -fcs-profile-generate={stage2_dir}",
+        )
+        _run_pgo_training(z3, build_dir)
+        _merge_profiles(profile, [stage1_profile, *stage2_dir.glob("*.profraw")])
+
+    print(f"PGO stage 3/3: optimized build with {profile}")
+    _clang_cmake_build(build_dir, cfg, f"-fprofile-use={profile}")
+
+
+def _clang_cmake_build(build_dir, cfg, flags, extra_opts=()):
+    env = _cmake_env("clang", "clang++")
+    if arch := _host_arch_flag(cfg["cmake"]):
+        flags = f"{flags} {arch}"
+    cmake_opts = [
+        *cfg["cmake"],
+        f"-DCMAKE_C_FLAGS={flags}",
+        f"-DCMAKE_CXX_FLAGS={flags}",
+        *extra_opts,
+    ]
+    cmake_opts += _compiler_launcher_opts(cmake_opts)
+    cmake_cmd = (
+        'cmake -G "Unix Makefiles" '
+        f"-DCMAKE_INSTALL_PREFIX={ROOT} "
+        + " ".join(shlex.quote(opt) for opt in cmake_opts)
+        + " ../"
+    )
+    _cmake_configure(cmake_cmd, build_dir, env)
+    run_cmd(f"make -j {_make_jobs()}", cwd=str(build_dir), env=env)
+
+
+def _cmake_configure(cmake_cmd, build_dir, env):
+    """Run the CMake configure step unless ``build_dir`` already has it.
+
+    The configure command and its compilers are stamped next to
+    ``CMakeCache.txt``; when the cache exists and the stamp is unchanged the
+    step is skipped, and the generated Makefiles re-run CMake themselves if
+    a CMakeLists.txt changed. Otherwise the old cache is removed first:
+    CMake never re-detects the compiler and keeps cached launchers and
+    flags that the new command no longer passes.
+    """
+    cache = Path(build_dir) / "CMakeCache.txt"
+    stamp = Path(build_dir) / CONFIGURE_STAMP
+    configuration = f"CC={env['CC']} CXX={env['CXX']} {cmake_cmd}"
+    if cache.exists() and stamp.exists() and stamp.read_text() == configuration:
+        print(f"CMake configuration in {build_dir} is up to date, skipping")
+        return
+
+    stamp.unlink(missing_ok=True)
+    if cache.exists():
+        print(f"CMake configuration in {build_dir} changed, clearing its cache")
+        cache.unlink()
+        shutil.rmtree(Path(build_dir) / "CMakeFiles", ignore_errors=True)
+    run_cmd(cmake_cmd, cwd=str(build_dir), env=env)
+    stamp.write_text(configuration)
+
+
+def _run_pgo_training(z3, build_dir):
+    """Run the instrumented ``z3`` binary over the PGO training workload."""
+    run_cmd(_training_cmd(z3, build_dir), cwd=str(z3))
+
+
+def _training_cmd(z3, build_dir):
+    """Return the argv running the training workload on the built ``z3``.
+
+    ``Z3_PGO_TRAINING`` names a script that is invoked with the path of the
+    ``z3`` binary; otherwise every ``.smt2`` file under ``z3/examples`` is
+    solved. Solver failures are ignored, only the profile matters.
+    """
+    z3_bin = str(build_dir / "z3")
+    if script := os.getenv("Z3_PGO_TRAINING"):
+        return ["sh", "-c", f'{script} "$0"', z3_bin]
+
+    workloads = sorted(str(smt2) for smt2 in (z3 / "examples").rglob("*.smt2"))
+    if not workloads:
+        sys.exit("No PGO training workload: set Z3_PGO_TRAINING")
+    print(f"Training on {len(workloads)} SMT-LIB files")
+    loop = 'for f in "$@"; do "$0" -T:60 "$f" >/dev/null 2>&1 || true; done'
+    return ["sh", "-c", loop, z3_bin, *workloads]
+
+
+def _bolt_optimize(z3, build_dir):
+    """Rewrite the freshly built libz3.so with BOLT before it is installed.
+
+    The training workload (see ``_bolt_training_cmd``) runs under
+    ``perf record``; with LBR support the branch stacks are sampled,
+    otherwise perf2bolt falls back to plain samples (``-nl``). The optimized
+    library replaces the one in the build tree so ``make install`` picks it
+    up.
+    """
+    _require_tools("perf", "perf2bolt", "llvm-bolt")
+
+    lib = (build_dir / "libz3.so").resolve()
+    perf_data, fdata = build_dir / "perf.data", build_dir / "perf.fdata"
+    lbr = Path("/sys/bus/event_source/devices/cpu/caps/branches").exists()
+
+    record = ["perf", "record", "-e", "cycles:u", "-o", str(perf_data)]
+    if lbr:
+        record += ["-j", "any,u"]
+    training = _bolt_training_cmd(z3, build_dir)
+    library_path = os.pathsep.join(
+        filter(None, (str(build_dir), os.getenv("LD_LIBRARY_PATH")))
+    )
+    run_cmd(
+        [*record, "--", *training],
+        cwd=str(z3),
+        env={"LD_LIBRARY_PATH": library_path},
+    )
+
+    perf2bolt = ["perf2bolt", "-p", str(perf_data), "-o", str(fdata), str(lib)]
+    if not lbr:
+        perf2bolt.append("-nl")
+    run_cmd(perf2bolt)
+
+    bolted = lib.with_name(lib.name + ".bolt")
+    run_cmd(["llvm-bolt", str(lib), "-o", str(bolted), f"-data={fdata}", *BOLT_FLAGS])
+    os.replace(bolted, lib)
+
+
+def _bolt_training_cmd(z3, build_dir):
+    """Return the argv of a BOLT training run that loads the built libz3.so.
+
+    The ``z3`` shell links the solver objects itself rather than libz3.so,
+    so profiling it leaves the library without samples. ``Z3_BOLT_TRAINING``
+    names a script that is invoked with the path of libz3.so; otherwise Z3's
+    C API example is built against the library and run.
+    """
+    lib = str(build_dir / "libz3.so")
+    if script := os.getenv("Z3_BOLT_TRAINING"):
+        return ["sh", "-c", f'{script} "$0"', lib]
+
+    run_cmd(f"make -j {_make_jobs()} c_example", cwd=str(build_dir))
+    example = build_dir / "examples" / "c_example_build_dir" / "c_example"
+    if not example.exists():
+        sys.exit(f"No BOLT training workload at {example}: set Z3_BOLT_TRAINING")
+    return [str(example)]
+
+
+def _merge_profiles(output, inputs):
+    inputs = [str(path) for path in inputs]
+    if not inputs:
+        sys.exit(f"PGO training produced no profile data for {output}")
+    run_cmd(["llvm-profdata", "merge", f"-output={output}", *inputs])
 
 
 def install_z3():
@@ -314,14 +999,14 @@ def install_z3():
     make_dir_exist("ivy/lib")
     make_dir_exist("ivy/z3")
 
-    if platform.system() == "Windows":
+    if IS_WINDOWS:
         do_cmd("copy submodules\\z3\\src\\api\\*.h ivy\\include")
         do_cmd('copy "submodules\\z3\\src\\api\\c++\\*.h" ivy\\include')
         do_cmd("copy submodules\\z3\\build\\*.dll ivy\\lib")
         do_cmd("copy submodules\\z3\\build\\*.lib ivy\\lib")
         do_cmd("copy submodules\\z3\\build\\*.dll ivy\\z3")
         do_cmd("copy submodules\\z3\\build\\python\\z3\\*.py ivy\\z3")
-    elif platform.system() == "Darwin":
+    elif IS_DARWIN:
         do_cmd("cp include/*.h ivy/include")
         do_cmd("cp lib/*.dylib ivy/lib")
         do_cmd("cp lib/*.dylib ivy/z3")
@@ -336,7 +1021,7 @@ def install_z3():
     # For CMake-based builds (non-empty BUILD_MODE), make install doesn't
     # use --pypkgdir, so Python bindings aren't placed in ivy/z3/ automatically.
     # Copy them explicitly from the build output and source tree.
-    if BUILD_MODE in MODES and BUILD_MODE != "":
+    if Z3_BUILD_MODE:
         z3_py_src = SUBMOD / "z3" / "src" / "api" / "python" / "z3"
         z3_build_py = SUBMOD / "z3" / "build" / "python" / "z3"
 
@@ -383,18 +1068,18 @@ def build_picotls():
         )
         exit(1)
 
-    cwd = os.getcwd()
-    os.chdir("submodules/picotls")
+    picotls = "submodules/picotls"
 
     # TODO: extract commit from version_config
     # TODO: Building Docker image 'panther_ivy_rfc9000_rel-lto:latest':[91mfatal: not a git repository: /opt/panther_ivy/submodules/picotls/../../../../../../../.git/modules/panther/plugins/services/testers/panther_ivy/modules/submodules/picotls
     # do_cmd('git checkout 047c5fe20bb9ea91c1caded8977134f19681ec76')
 
-    if platform.system() == "Windows":
+    if IS_WINDOWS:
         do_cmd(
             '"{}" & msbuild /p:OPENSSL64DIR=c:\\OpenSSL-Win64 picotlsvs\\picotls\\picotls.vcxproj'.format(
                 find_vs()
-            )
+            ),
+            cwd=picotls,
         )
     else:
         ssl_prefix = detect_openssl_prefix()
@@ -404,96 +1089,71 @@ def build_picotls():
             f"-DOPENSSL_ROOT_DIR={ssl_prefix}",
             f"-DOPENSSL_INCLUDE_DIR={ssl_prefix}/include",
         ]
-        if platform.system() == "Darwin":
+        if IS_DARWIN:
             cmake_args.insert(
                 0,
                 f'PKG_CONFIG_PATH="{ssl_prefix}/lib/pkgconfig"',
             )
-        do_cmd(" ".join(cmake_args))
-        do_cmd("make")
-
-    os.chdir(cwd)
+        do_cmd(" ".join(cmake_args), cwd=picotls)
+        do_cmd("make", cwd=picotls)
 
 
 def install_picotls():
     make_dir_exist("ivy/lib")
     make_dir_exist("ivy/include")
 
-    cwd = os.getcwd()
-    os.chdir("submodules/picotls")
+    picotls = "submodules/picotls"
 
-    if platform.system() == "Windows":
-        do_cmd("copy include\\*.h ..\\..\\ivy\\include\\")
-        make_dir_exist("../../ivy/include/picotls")
-        do_cmd("copy include\\picotls\\*.h ..\\..\\ivy\\include\\picotls\\")
-        do_cmd("copy picotlsvs\\picotls\\*.h ..\\..\\ivy\\include\\picotls\\")
-        do_cmd("copy picotlsvs\\picotls\\x64\\Debug\\picotls.lib ..\\..\\ivy\\lib\\")
+    if IS_WINDOWS:
+        do_cmd("copy include\\*.h ..\\..\\ivy\\include\\", cwd=picotls)
+        make_dir_exist("ivy/include/picotls")
+        do_cmd(
+            "copy include\\picotls\\*.h ..\\..\\ivy\\include\\picotls\\",
+            cwd=picotls,
+        )
+        do_cmd(
+            "copy picotlsvs\\picotls\\*.h ..\\..\\ivy\\include\\picotls\\",
+            cwd=picotls,
+        )
+        do_cmd(
+            "copy picotlsvs\\picotls\\x64\\Debug\\picotls.lib ..\\..\\ivy\\lib\\",
+            cwd=picotls,
+        )
     else:
-        make_dir_exist("../../ivy/include/picotls")
-        do_cmd("cp -a include/*.h ../../ivy/include/")
-        do_cmd("cp -a include/picotls/*.h ../../ivy/include/picotls/")
-        do_cmd("cp -a *.a ../../ivy/lib/")
-
-    os.chdir(cwd)
+        make_dir_exist("ivy/include/picotls")
+        do_cmd("cp -a include/*.h ../../ivy/include/", cwd=picotls)
+        do_cmd("cp -a include/picotls/*.h ../../ivy/include/picotls/", cwd=picotls)
+        do_cmd("cp -a *.a ../../ivy/lib/", cwd=picotls)
 
 
 def build_v2_compiler():
-    cwd = os.getcwd()
-
-    os.chdir("ivy/ivy2/s1")
-    do_cmd("python3.10 ../../ivy_to_cpp.py target=repl ivyc_s1.ivy")
-    do_cmd("g++ -O2 -o ivyc_s1 ivyc_s1.cpp -pthread")
+    s1, s2, s3 = "ivy/ivy2/s1", "ivy/ivy2/s2", "ivy/ivy2/s3"
 
-    os.chdir("../s2")
-    do_cmd("IVY_INCLUDE_PATH=../s1/include ../s1/ivyc_s1 ivyc_s2.ivy")
-    do_cmd("g++ -I../s1/include -O2 -o ivyc_s2 -std=c++17 ivyc_s2.cpp")
+    do_cmd("python3.10 ../../ivy_to_cpp.py target=repl ivyc_s1.ivy", cwd=s1)
+    do_cmd("g++ -O2 -o ivyc_s1 ivyc_s1.cpp -pthread", cwd=s1)
 
-    os.chdir("../s3")
-    do_cmd("IVY_INCLUDE_PATH=../s2/include ../s2/ivyc_s2 ivyc_s3.ivy")
+    do_cmd("IVY_INCLUDE_PATH=../s1/include ../s1/ivyc_s1 ivyc_s2.ivy", cwd=s2)
+    do_cmd("g++ -I../s1/include -O2 -o ivyc_s2 -std=c++17 ivyc_s2.cpp", cwd=s2)
 
-    os.chdir(cwd)
+    do_cmd("IVY_INCLUDE_PATH=../s2/include ../s2/ivyc_s2 ivyc_s3.ivy", cwd=s3)
 
 
 def build_aiger():
-    cwd = os.getcwd()
-
-    os.chdir("submodules/aiger")
-
-    do_cmd("./configure.sh && make -j 4")
-
-    os.chdir(cwd)
+    do_cmd(f"./configure.sh && make -j {_make_jobs()}", cwd="submodules/aiger")
 
 
 def install_aiger():
     make_dir_exist("ivy/bin")
-    cwd = os.getcwd()
-
-    os.chdir("submodules/aiger")
-
-    do_cmd("cp -a aigtoaig ../../ivy/bin/")
-
-    os.chdir(cwd)
+    do_cmd("cp -a aigtoaig ../../ivy/bin/", cwd="submodules/aiger")
 
 
 def build_abc():
-    cwd = os.getcwd()
-
-    os.chdir("submodules/abc")
-
-    do_cmd("make -j 4")
-
-    os.chdir(cwd)
+    do_cmd(f"make -j {_make_jobs()}", cwd="submodules/abc")
 
 
 def install_abc():
     make_dir_exist("ivy/bin")
-    cwd = os.getcwd()
-
-    os.chdir("submodules/abc")
-
-    do_cmd("cp -a abc ../../ivy/bin/")
-
-    os.chdir(cwd)
+    do_cmd("cp -a abc ../../ivy/bin/", cwd="submodules/abc")
 
 
 if __name__ == "__main__":
@@ -535,26 +1195,15 @@ if __name__ == "__main__":
             print("[z3-only mode] Building Z3 from submodule")
             build_z3()
             install_z3()
-    elif args.skip_z3:
-        print("[skip-z3 mode] Skipping Z3, building picotls/aiger/abc")
-        build_picotls()
-        install_picotls()
-        if platform.system() == "Windows":
-            print("Model checking not supported on Windows")
-        else:
-            build_aiger()
-            install_aiger()
-            build_abc()
-            install_abc()
     else:
-        build_z3()
-        install_z3()
-        build_picotls()
-        install_picotls()
-        if platform.system() == "Windows":
+        # The submodules don't depend on each other, so build them side by side
+        chains = [(build_picotls, install_picotls)]
+        if args.skip_z3:
+            print("[skip-z3 mode] Skipping Z3, building picotls/aiger/abc")
+        else:
+            chains.insert(0, (build_z3, install_z3))
+        if IS_WINDOWS:
             print("Model checking not supported on Windows")
         else:
-            build_aiger()
-            install_aiger()
-            build_abc()
-            install_abc()
+            chains += [(build_aiger, install_aiger), (build_abc, install_abc)]
+        run_parallel(*chains)
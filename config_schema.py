@@ -142,8 +142,12 @@ class PantherIvyConfig(ServiceConfig):
     Compilation Modes (``build_mode``):
         - **(empty)** -- original method, Shadow NS compatible
         - **debug-asan** -- AddressSanitizer (``-O1 -g -fsanitize=address``)
+        - **debug-asan-stl** -- debug-asan plus ``-D_GLIBCXX_DEBUG``
         - **rel-lto** -- Link Time Optimization (``-O3 -flto``)
+        - **release-thin-lto** -- parallel LTO (clang ThinLTO or gcc ``-flto=N``)
         - **release-static-pgo** -- PGO + static linking (``-fprofile-use``)
+        - **release-bolt** -- PGO + LTO shared libz3, post-link optimized by BOLT
+        - **release-cs-pgo** -- clang context-sensitive PGO, three-stage build
 
     Language: C/C++ + Python | Source: panther_ivy submodule
     Build time: ~30 min (first build) | Docker image: ~1GB
@@ -216,8 +220,8 @@ class PantherIvyConfig(ServiceConfig):
     )
     build_mode: Optional[str] = Field(
         default=None,
-        description="Build mode for compilation: '' (original/Shadow compatible), 'debug-asan', 'rel-lto', or 'release-static-pgo'",
-        pattern=r"^(|debug-asan|rel-lto|release-static-pgo)$",
+        description="Build mode for compilation: '' (original/Shadow compatible), 'debug-asan', 'debug-asan-stl', 'rel-lto', 'release-thin-lto', 'release-static-pgo', 'release-bolt', or 'release-cs-pgo'",
+        pattern=r"^(|debug-asan|debug-asan-stl|rel-lto|release-thin-lto|release-static-pgo|release-bolt|release-cs-pgo)$",
     )
     z3_source: Optional[str] = Field(
         default="local",
@@ -1,8 +1,48 @@
+import copy
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional, Tuple
 
 from ._shared import determine_verdict
 
+# Upper bound on threads used to analyse services concurrently
+_MAX_ANALYSIS_WORKERS = 8
+
+# Output types that the analysis helpers match case-insensitively
+_LOWERED_OUTPUT_TYPES = ("stdout", "stderr", "compile_status", "compilation_status")
+
+# Substrings marking an error line in stderr, in reporting order
+_ERROR_PATTERNS = (
+    "No such file or directory",
+    "timeout: failed to run command",
+    "error:",
+    "Error:",
+    "ERROR:",
+    "failed:",
+    "Failed:",
+    "FAILED:",
+)
+
+# Lowercased keyword tuples, longest (most selective) first
+_DETAILED_ERROR_WORDS = ("timeout", "failed", "error")
+_COMPILE_STATUS_FAILURE = ("compilation failed", "failed", "error")
+_COMPILE_STATUS_SUCCESS = ("compilation succeeded", "succeeded", "success", "ok")
+_COMPILE_STDOUT_SUCCESS = (
+    "test executable created",
+    "compilation succeeded",
+    "compilation complete",
+    "successfully built",
+)
+
+# Severity keywords, highest level first; matched against lowercased lines.
+# One regex per level keeps the precedence (e.g. "error: fatal" is critical).
+_SEVERITY_PATTERNS = (
+    ("critical", re.compile(r"critical|fatal|abort|crash")),
+    ("high", re.compile(r"error|failed|timeout")),
+    ("medium", re.compile(r"warn")),
+)
+
 
 class IvyAnalysisMixin:
     """
@@ -12,14 +52,24 @@ class IvyAnalysisMixin:
     method into smaller, focused methods following PANTHER conventions.
     """
 
+    def __init__(self, *args, **kwargs):
+        """Initialize the per-service analysis cache."""
+        super().__init__(*args, **kwargs)
+        # service name -> (output file signature, analysis result)
+        self._service_analysis_cache = {}
+
     def analyze_outputs_with_data(
-        self, collected_outputs: Dict[str, Any]
+        self, collected_outputs: Dict[str, Any], early_exit: bool = False
     ) -> Dict[str, Any]:
         """
         Analyze collected outputs to determine test success/failure.
 
         Args:
             collected_outputs: Dictionary of collected outputs from services
+            early_exit: Stop analysing further services as soon as one service
+                makes the test fail (negative verdict or failed compilation).
+                The verdict is unchanged, but detailed_results and failures
+                then only cover the services analysed so far.
 
         Returns:
             Dict[str, Any]: Analysis results
@@ -27,18 +77,39 @@ class IvyAnalysisMixin:
         self.logger.info("Analyzing outputs from test execution")
         self.logger.debug(f"Collected outputs: {collected_outputs}")
 
-        # Organize outputs by service
-        service_outputs = self._organize_outputs_by_service(collected_outputs)
+        # Group output sources by service; files are read by the workers below
+        service_sources = self._group_output_sources_by_service(collected_outputs)
 
-        # Analyze each service
+        # Analyze each service independently (file I/O + regex scanning overlap)
         detailed_results = {}
+        if service_sources:
+            max_workers = min(_MAX_ANALYSIS_WORKERS, len(service_sources))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._analyze_service_sources, name, sources): name
+                    for name, sources in service_sources.items()
+                }
+                if early_exit:
+                    for future in as_completed(futures):
+                        if self._is_conclusive_failure(future.result()):
+                            self.logger.info(
+                                "Service %s failed, skipping remaining services",
+                                futures[future],
+                            )
+                            for pending in futures:
+                                pending.cancel()
+                            break
+                for future, service_name in futures.items():
+                    if future.cancelled():
+                        continue
+                    service_result = future.result()
+                    if service_result is not None:
+                        detailed_results[service_name] = service_result
+
         all_failures = []
         seen_failures = set()
 
-        for service_name, outputs in service_outputs.items():
-            service_result = self._analyze_service_outputs(service_name, outputs)
-            detailed_results[service_name] = service_result
-
+        for service_result in detailed_results.values():
             verdict = service_result.get("verdict", "UNKNOWN")
             if verdict != "UNKNOWN":
                 # Decisive IVY verdict — only NO_VIOLATION_FOUND is a pass
@@ -82,6 +153,24 @@ class IvyAnalysisMixin:
             "failures": all_failures,
         }
 
+    @staticmethod
+    def _is_conclusive_failure(service_result: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a single service result fails the whole test.
+
+        Args:
+            service_result: Analysis result of one service (or None)
+
+        Returns:
+            True if the test cannot pass regardless of the other services
+        """
+        if service_result is None:
+            return False
+        verdict = service_result.get("verdict", "UNKNOWN")
+        if verdict not in ("UNKNOWN", "NO_VIOLATION_FOUND"):
+            return True
+        return not service_result.get("compilation_succeeded", False)
+
     def analyze_ivy_outputs(self) -> Dict[str, Any]:
         """
         Analyze collected outputs for Ivy tests.
@@ -117,6 +206,29 @@ class IvyAnalysisMixin:
         """
         service_outputs = {}
 
+        for service_name, sources in self._group_output_sources_by_service(
+            collected_outputs
+        ).items():
+            outputs = self._load_service_outputs(sources)
+            if outputs:
+                service_outputs[service_name] = outputs
+
+        return service_outputs
+
+    def _group_output_sources_by_service(
+        self, collected_outputs: Dict[str, Any]
+    ) -> Dict[str, List[Tuple[str, Any]]]:
+        """
+        Group raw output entries by service name without reading any files.
+
+        Args:
+            collected_outputs: Raw collected outputs
+
+        Returns:
+            Dict mapping service name to its (output_type, env_data) entries
+        """
+        service_sources = {}
+
         for output_key, env_data in collected_outputs.items():
             # Extract service name and output type from key
             service_name, output_type = self._parse_output_key(output_key)
@@ -124,17 +236,100 @@ class IvyAnalysisMixin:
             if not service_name:
                 continue
 
+            service_sources.setdefault(service_name, []).append((output_type, env_data))
+
+        return service_sources
+
+    def _load_service_outputs(self, sources: List[Tuple[str, Any]]) -> Dict[str, str]:
+        """
+        Read the output files of a single service.
+
+        Args:
+            sources: (output_type, env_data) entries for the service
+
+        Returns:
+            Service outputs by type; contents of the same type are concatenated
+        """
+        outputs = {}
+
+        for output_type, env_data in sources:
             # Get file content
             content = self._read_output_content(env_data)
             if content is not None:
-                if service_name not in service_outputs:
-                    service_outputs[service_name] = {}
-                if output_type in service_outputs[service_name]:
-                    service_outputs[service_name][output_type] += "\n" + content
+                if output_type in outputs:
+                    outputs[output_type] += "\n" + content
                 else:
-                    service_outputs[service_name][output_type] = content
+                    outputs[output_type] = content
 
-        return service_outputs
+        return outputs
+
+    def _analyze_service_sources(
+        self, service_name: str, sources: List[Tuple[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read and analyze the outputs of a single service.
+
+        Runs in a worker thread of analyze_outputs_with_data. The result is
+        cached per service and reused while its output files keep the same
+        path, mtime and size.
+
+        Args:
+            service_name: Name of the service
+            sources: (output_type, env_data) entries for the service
+
+        Returns:
+            Analysis result for the service, or None if nothing could be read
+        """
+        signature = self._output_files_signature(sources)
+        cached = self._service_analysis_cache.get(service_name)
+        if signature is not None and cached is not None and cached[0] == signature:
+            # Callers may modify the result; hand out a copy of the cached one
+            return copy.deepcopy(cached[1])
+
+        outputs = self._load_service_outputs(sources)
+        if not outputs:
+            return None
+        result = self._analyze_service_outputs(service_name, outputs)
+        if signature is not None:
+            self._service_analysis_cache[service_name] = (
+                signature,
+                copy.deepcopy(result),
+            )
+        return result
+
+    @staticmethod
+    def _output_files_signature(
+        sources: List[Tuple[str, Any]],
+    ) -> Optional[Tuple[Tuple[str, str, int, int], ...]]:
+        """
+        Identify the output files of a service by path, mtime and size.
+
+        Args:
+            sources: (output_type, env_data) entries for the service
+
+        Returns:
+            Signature tuple, or None if a source is not an existing file path
+        """
+        signature = []
+        for output_type, env_data in sources:
+            file_path = IvyAnalysisMixin._output_file_path(env_data)
+            if not file_path:
+                return None
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return None
+            signature.append((output_type, file_path, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    @staticmethod
+    def _output_file_path(env_data: Any) -> Optional[str]:
+        """Return the output file path held by ``env_data``, if any."""
+        if isinstance(env_data, dict):
+            file_path = next(iter(env_data.values()), None)
+        else:
+            file_path = env_data
+        return file_path if isinstance(file_path, str) else None
 
     def _parse_output_key(self, output_key: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -198,13 +393,13 @@ class IvyAnalysisMixin:
         Returns:
             File content or None
         """
-        if isinstance(env_data, dict):
-            file_path = list(env_data.values())[0] if env_data else None
-        else:
-            file_path = env_data
+        file_path = self._output_file_path(env_data)
 
-        if file_path and isinstance(file_path, str):
+        if file_path:
             try:
+                # Empty outputs (e.g. stderr on success) need no open/read
+                if os.stat(file_path).st_size == 0:
+                    return ""
                 with open(file_path, "r") as f:
                     return f.read()
             except Exception as e:
@@ -225,6 +420,13 @@ class IvyAnalysisMixin:
         Returns:
             Enhanced analysis result for the service
         """
+        # Lowercase each scanned buffer once; the helpers below match
+        # case-insensitively. Other types (ivy_log, test_results) are never
+        # lowercased, so they are skipped.
+        outputs_lower = {
+            k: outputs[k].lower() for k in _LOWERED_OUTPUT_TYPES if k in outputs
+        }
+
         result = {
             "has_stderr": False,
             "has_errors": False,
@@ -259,21 +461,21 @@ class IvyAnalysisMixin:
                 result["error_messages"].extend(errors)
 
             # Enhanced stderr analysis
-            stderr_analysis = self._analyze_stderr_details(
-                outputs["stderr"], service_name
+            self._analyze_stderr_details(
+                outputs["stderr"], outputs_lower["stderr"], service_name, result
             )
-            result.update(stderr_analysis)
 
         # Analyze stdout for additional details
         if "stdout" in outputs and outputs["stdout"]:
-            stdout_analysis = self._analyze_stdout_details(
-                outputs["stdout"], service_name
+            self._analyze_stdout_details(
+                outputs["stdout"], outputs_lower["stdout"], service_name, result
             )
-            result.update(stdout_analysis)
 
         # Check compilation and test execution markers
-        result["compilation_succeeded"] = self._check_compilation_status(outputs)
-        result["test_executed"] = self._verify_test_execution(outputs)
+        result["compilation_succeeded"] = self._check_compilation_status(
+            outputs, outputs_lower
+        )
+        result["test_executed"] = self._verify_test_execution(outputs, outputs_lower)
 
         # --- IVY verdict determination (primary decision logic) ---
         stdout_content = outputs.get("stdout", "")
@@ -339,39 +541,34 @@ class IvyAnalysisMixin:
         return result
 
     def _analyze_stderr_details(
-        self, stderr_content: str, service_name: str
-    ) -> Dict[str, Any]:
+        self,
+        stderr_content: str,
+        stderr_lower: str,
+        service_name: str,
+        details: Dict[str, Any],
+    ) -> None:
         """
         Extract detailed information from stderr content.
 
+        Fills connection_events, detailed_errors, performance_metrics and
+        process_lifecycle of the service result in place.
+
         Args:
             stderr_content: Content of stderr
+            stderr_lower: Lowercased content of stderr
             service_name: Name of the service
-
-        Returns:
-            Dictionary with detailed stderr analysis
+            details: Service result to update
         """
-        details = {
-            "connection_events": [],
-            "detailed_errors": [],
-            "performance_metrics": {},
-            "process_lifecycle": {
-                "started": False,
-                "running": False,
-                "completed": False,
-                "terminated": False,
-            },
-        }
+        lines = zip(stderr_content.split("\n"), stderr_lower.split("\n"))
 
-        lines = stderr_content.split("\n")
-
-        for line in lines:
+        for line, line_lower in lines:
             line = line.strip()
             if not line:
                 continue
+            line_lower = line_lower.strip()
 
             # Extract connection events
-            if "binding client id" in line.lower():
+            if "binding client id" in line_lower:
                 details["connection_events"].append(
                     {
                         "type": "client_binding",
@@ -379,7 +576,7 @@ class IvyAnalysisMixin:
                         "timestamp": self._extract_timestamp(line),
                     }
                 )
-            elif "socket" in line.lower():
+            elif "socket" in line_lower:
                 details["connection_events"].append(
                     {
                         "type": "socket_event",
@@ -389,57 +586,58 @@ class IvyAnalysisMixin:
                 )
 
             # Extract process lifecycle events
-            if "starting runtime phase" in line.lower():
+            if "starting runtime phase" in line_lower:
                 details["process_lifecycle"]["started"] = True
-            elif "call_generating" in line.lower():
+            elif "call_generating" in line_lower:
                 details["process_lifecycle"]["running"] = True
-            elif "cycles =" in line.lower():
+            elif "cycles =" in line_lower:
                 # Extract cycle count for performance metrics
+                _, _, rest = line.partition("cycles =")
+                cycles = rest.split(None, 1)
                 try:
-                    cycles = line.split("cycles =")[1].strip().split()[0]
-                    details["performance_metrics"]["total_cycles"] = int(cycles)
-                except (ValueError, IndexError, AttributeError):
+                    details["performance_metrics"]["total_cycles"] = int(cycles[0])
+                except (ValueError, IndexError):
                     self.logger.debug(f"Could not extract cycle count from: {line!r}")
 
             # Extract detailed error information
-            if any(
-                error_word in line.lower()
-                for error_word in ["error", "failed", "timeout"]
-            ):
+            if any(error_word in line_lower for error_word in _DETAILED_ERROR_WORDS):
                 details["detailed_errors"].append(
                     {
                         "message": line,
                         "timestamp": self._extract_timestamp(line),
-                        "severity": self._determine_error_severity(line),
+                        "severity": self._determine_error_severity(line_lower),
                     }
                 )
 
-        return details
-
     def _analyze_stdout_details(
-        self, stdout_content: str, service_name: str
-    ) -> Dict[str, Any]:
+        self,
+        stdout_content: str,
+        stdout_lower: str,
+        service_name: str,
+        details: Dict[str, Any],
+    ) -> None:
         """
         Extract detailed information from stdout content.
 
+        Fills return_code, exit_status and runtime_duration of the service
+        result in place.
+
         Args:
             stdout_content: Content of stdout
+            stdout_lower: Lowercased content of stdout
             service_name: Name of the service
-
-        Returns:
-            Dictionary with detailed stdout analysis
+            details: Service result to update
         """
-        details = {"return_code": None, "exit_status": None, "runtime_duration": None}
-
-        lines = stdout_content.split("\n")
+        lines = zip(stdout_content.split("\n"), stdout_lower.split("\n"))
 
-        for line in lines:
+        for line, line_lower in lines:
             line = line.strip()
             if not line:
                 continue
+            line_lower = line_lower.strip()
 
             # Extract return codes and exit status
-            if "exit code" in line.lower() or "return code" in line.lower():
+            if "exit code" in line_lower or "return code" in line_lower:
                 try:
                     # Try to extract numeric exit code
                     code_match = re.search(
@@ -450,11 +648,11 @@ class IvyAnalysisMixin:
                         details["exit_status"] = (
                             "success" if details["return_code"] == 0 else "failure"
                         )
-                except (ValueError, IndexError, AttributeError):
+                except ValueError:
                     self.logger.debug(f"Could not extract exit code from: {line!r}")
 
             # Extract timing information
-            if "duration" in line.lower() or "elapsed" in line.lower():
+            if "duration" in line_lower or "elapsed" in line_lower:
                 try:
                     time_match = re.search(
                         r"(\d+(?:\.\d+)?)\s*(?:s|sec|seconds?|ms|milliseconds?)",
@@ -463,11 +661,9 @@ class IvyAnalysisMixin:
                     )
                     if time_match:
                         details["runtime_duration"] = time_match.group(1)
-                except (ValueError, IndexError, AttributeError):
+                except ValueError:
                     self.logger.debug(f"Could not extract duration from: {line!r}")
 
-        return details
-
     # ------------------------------------------------------------------
     # IVY verdict determination
     # ------------------------------------------------------------------
@@ -504,28 +700,20 @@ class IvyAnalysisMixin:
             return timestamp_match.group(1)
         return None
 
-    def _determine_error_severity(self, error_line: str) -> str:
+    def _determine_error_severity(self, error_line_lower: str) -> str:
         """
         Determine error severity based on keywords.
 
         Args:
-            error_line: Error message line
+            error_line_lower: Lowercased error message line
 
         Returns:
             Severity level: critical, high, medium, low
         """
-        error_line_lower = error_line.lower()
-
-        if any(
-            word in error_line_lower for word in ["critical", "fatal", "abort", "crash"]
-        ):
-            return "critical"
-        elif any(word in error_line_lower for word in ["error", "failed", "timeout"]):
-            return "high"
-        elif any(word in error_line_lower for word in ["warning", "warn"]):
-            return "medium"
-        else:
-            return "low"
+        for severity, pattern in _SEVERITY_PATTERNS:
+            if pattern.search(error_line_lower):
+                return severity
+        return "low"
 
     def _check_error_patterns(self, stderr_content: str) -> List[str]:
         """
@@ -537,34 +725,28 @@ class IvyAnalysisMixin:
         Returns:
             List of error messages found
         """
-        error_patterns = [
-            "No such file or directory",
-            "timeout: failed to run command",
-            "error:",
-            "Error:",
-            "ERROR:",
-            "failed:",
-            "Failed:",
-            "FAILED:",
-        ]
-
         errors = []
-        for pattern in error_patterns:
-            if pattern in stderr_content:
-                # Extract the line containing the error
-                for line in stderr_content.split("\n"):
-                    if pattern in line:
-                        errors.append(line.strip())
-                        break
+        for pattern in _ERROR_PATTERNS:
+            idx = stderr_content.find(pattern)
+            if idx != -1:
+                # Extract the line containing the first occurrence of the error
+                start = stderr_content.rfind("\n", 0, idx) + 1
+                end = stderr_content.find("\n", idx)
+                if end == -1:
+                    end = len(stderr_content)
+                errors.append(stderr_content[start:end].strip())
 
         return errors
 
-    def _check_compilation_status(self, outputs: Dict[str, str]) -> bool:
+    def _check_compilation_status(
+        self, outputs: Dict[str, str], outputs_lower: Dict[str, str]
+    ) -> bool:
         """
         Check if compilation succeeded.
 
         Args:
             outputs: Service outputs
+            outputs_lower: Service outputs, lowercased
 
         Returns:
             True if compilation succeeded
@@ -575,41 +757,23 @@ class IvyAnalysisMixin:
         # - Short status values like "succeeded", "success", "ok", "failed", "error"
         for key in ("compile_status", "compilation_status"):
             if key in outputs and outputs[key]:
-                status = outputs[key].strip().lower()
-                failure_patterns = [
-                    "compilation failed",
-                    "failed",
-                    "error",
-                ]
-                success_patterns = [
-                    "compilation succeeded",
-                    "succeeded",
-                    "success",
-                    "ok",
-                ]
+                status = outputs_lower[key].strip()
                 # Check failure first to avoid masking by partial matches
-                if any(status == p or p in status for p in failure_patterns):
+                if any(p in status for p in _COMPILE_STATUS_FAILURE):
                     return False
-                elif any(status == p or p in status for p in success_patterns):
+                elif any(p in status for p in _COMPILE_STATUS_SUCCESS):
                     return True
 
         # Check stdout for compilation success patterns
         if "stdout" in outputs and outputs["stdout"]:
-            success_patterns = [
-                "compilation succeeded",
-                "compilation complete",
-                "successfully built",
-                "test executable created",
-            ]
-
-            stdout_lower = outputs["stdout"].lower()
-            for pattern in success_patterns:
+            stdout_lower = outputs_lower["stdout"]
+            for pattern in _COMPILE_STDOUT_SUCCESS:
                 if pattern in stdout_lower:
                     return True
 
         # Fallback: check stderr for lifecycle evidence of successful compilation
         if "stderr" in outputs and outputs["stderr"]:
-            stderr_lower = outputs["stderr"].lower()
+            stderr_lower = outputs_lower["stderr"]
             if (
                 "starting runtime phase" in stderr_lower
                 or "call_generating" in stderr_lower
@@ -618,7 +782,9 @@ class IvyAnalysisMixin:
 
         return False
 
-    def _verify_test_execution(self, outputs: Dict[str, str]) -> bool:
+    def _verify_test_execution(
+        self, outputs: Dict[str, str], outputs_lower: Dict[str, str]
+    ) -> bool:
         """
         Verify if test was actually executed.
 
@@ -631,6 +797,7 @@ class IvyAnalysisMixin:
 
         Args:
             outputs: Service outputs
+            outputs_lower: Service outputs, lowercased
 
         Returns:
             True if test was executed
@@ -652,7 +819,7 @@ class IvyAnalysisMixin:
 
         # Fallback: check stderr for evidence the test actually ran
         if "stderr" in outputs and outputs["stderr"]:
-            stderr_lower = outputs["stderr"].lower()
+            stderr_lower = outputs_lower["stderr"]
             if "call_generating" in stderr_lower or "cycles =" in stderr_lower:
                 return True
 
@@ -5,10 +5,14 @@ This mixin extracts command generation logic from the IvyCommandGenerator compon
 to follow standard PANTHER architecture patterns.
 """
 
-import os
+import functools
+import html
+import logging
+import posixpath
 import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Protocol, Union
+from typing import Any, Callable, Dict, List, Optional, Protocol, Union
 
 from panther.core.command_processor.builders import ServiceCommandBuilder
 from panther.core.command_processor.models.shell_command import ShellCommand
@@ -16,6 +20,138 @@ from panther.core.command_processor.utils import CommandUtils
 
 from ._shared import oppose_role
 
+# Sentinel for getattr() lookups where None is a meaningful attribute value
+_MISSING = object()
+
+# Patterns used to validate every rendered deployment command
+_UNRENDERED_TEMPLATE_RE = re.compile(r"\{\{[^}]*\}\}|\{%[^%]*%\}")
+_EMPTY_PARAM_RE = re.compile(r"(\w+)=\s*(?=\s|\}|$)")
+_PLACEHOLDER_RE = re.compile(r"@\{([^}]+)\}")
+
+# Patterns used by the shell syntax checks
+_MALFORMED_REDIRECTION_RE = re.compile(r">\d+/")
+_SUSPICIOUS_PATH_RE = re.compile(r"/[^/\s]*[^/\s\w.-][^/\s]*")
+_VALID_PATH_RE = re.compile(r"/[\w./-]*")
+
+# Ivy 1.7 include directory inside the container, where tests are compiled
+_IVY_INCLUDE_DIR = "$PYTHON_IVY_DIR/ivy/include/1.7"
+
+# Fixed command blocks, built once at import
+_PRE_COMPILE_LOG_HEADER = (
+    "echo '# Ivy setup log' >>  /app/logs/pre-compile/ivy_setup.log"
+)
+
+_IVY_UPDATE_COMMANDS = (
+    "echo 'Updating Ivy tool...' >> /app/logs/compile/ivy_setup.log",
+    "cd /opt/panther_ivy && sudo env PURE_PYTHON_BUILD=1 python3.10 -m pip install . >> /app/logs/compile/ivy_setup.log 2>&1",
+    "cd /opt/panther_ivy && if [ -f lib/libz3.so ]; then cp lib/libz3.so /opt/panther_ivy/ivy/z3/ && echo 'Copied libz3.so to ivy/z3/'; else echo 'No local libz3.so (z3_source=pip), skipping copy'; fi >> /app/logs/compile/ivy_setup.log 2>&1",
+    # Ensure target directories exist in the site-packages install
+    "mkdir -p \"$PYTHON_IVY_DIR/ivy/include/1.7\" \"$PYTHON_IVY_DIR/ivy/lib\" >> /app/logs/compile/ivy_setup.log 2>&1",
+    'echo "Copying updated Ivy files (from /opt/panther_ivy/ivy/include/1.7/) into $PYTHON_IVY_DIR/ivy/include/1.7/." >> /app/logs/compile/ivy_setup.log',
+    # Initialize copied files list for cleanup tracking
+    "echo '' > /app/logs/compile/copied_ivy_files.list",
+    "find '/opt/panther_ivy/ivy/include/1.7/' -type f -name '*.ivy' -exec echo {} ';' >> '/app/logs/compile/copied_ivy_files.list' 2>> /app/logs/compile/ivy_setup.log",
+    "find '/opt/panther_ivy/ivy/include/1.7/' -type f -name '*.ivy' -exec cp {} \"$PYTHON_IVY_DIR/ivy/include/1.7/\" ';' >> /app/logs/compile/ivy_setup.log 2>&1",
+    # Find and copy files while saving their destinations to the list
+    "echo 'Copied files saved to /app/logs/compile/copied_ivy_files.list for future cleanup' >> /app/logs/compile/ivy_setup.log",
+)
+
+# Protocols whose tests link against picotls and need the QUIC setup block
+_QUIC_LIKE_PROTOCOLS = frozenset({"quic", "apt"})
+
+_QUIC_LIBRARY_COMMANDS = (
+    "echo 'Copying QUIC libraries...' >> /app/logs/compile/ivy_setup.log",
+    "cp -f -a '/opt/picotls/'*.a $PYTHON_IVY_DIR/ivy/lib/ >> /app/logs/compile/ivy_setup.log 2>&1",
+    "cp -f -a '/opt/picotls/'*.a '/opt/panther_ivy/ivy/lib/'  >> /app/logs/compile/ivy_setup.log 2>&1",
+    "cp -f '/opt/picotls/include/picotls.h' $PYTHON_IVY_DIR/ivy/include/picotls.h >> /app/logs/compile/ivy_setup.log 2>&1",
+    "cp -f '/opt/picotls/include/picotls.h' '/opt/panther_ivy/ivy/include/picotls.h' >> /app/logs/compile/ivy_setup.log 2>&1",
+    "cp -r -f '/opt/picotls/include/picotls/.' $PYTHON_IVY_DIR/ivy/include/picotls >> /app/logs/compile/ivy_setup.log 2>&1",
+)
+
+# Template params that must resolve to a real value before rendering
+_CRITICAL_PARAMS = ("service_name", "target")
+_INVALID_PARAM_VALUES = frozenset({"None", "", "null", "undefined"})
+
+# Command prefixes that never fail a phase (simple logging/listing)
+_NON_CRITICAL = ("ls", "echo")
+
+
+@functools.lru_cache(maxsize=4096)
+def _test_directory_for(test_name: str, role_name: str) -> str:
+    """Map a test name to its <role>_tests directory, memoized per name and role."""
+    test_name = test_name.lower()
+    if "client" in test_name:
+        return "client_tests"
+    elif "server" in test_name:
+        return "server_tests"
+    else:
+        # Fallback to opposite role
+        return f"{oppose_role(role_name)}_tests"
+
+
+def _version_param_value(param: Any) -> Any:
+    """Unwrap a version_config parameter given as {"value": ...}, else as-is."""
+    if isinstance(param, dict) and "value" in param:
+        return param["value"]
+    return param
+
+
+def _impl_param_value(param: Any) -> Any:
+    """Unwrap an implementation parameter object with .value, else as-is."""
+    return getattr(param, "value", param)
+
+
+def _is_valid_placeholder(body: str) -> bool:
+    """Return True if body is service:attribute:format with ASCII identifiers."""
+    parts = body.split(":")
+    return len(parts) == 3 and all(p.isascii() and p.isidentifier() for p in parts)
+
+
+def _merge_param_values(
+    dst: Dict[str, Any], src: Dict[str, Any], unwrap: Callable[[Any], Any]
+) -> None:
+    """Copy every parameter of src into dst, unwrapping values with unwrap."""
+    dst.update({name: unwrap(value) for name, value in src.items()})
+
+
+def _strip_commands(
+    commands: List[Union[str, ShellCommand]],
+) -> List[Union[str, ShellCommand]]:
+    """Strip string commands once, dropping empty ones; ShellCommands pass through."""
+    normalized = []
+    for cmd in commands:
+        if isinstance(cmd, str):
+            cmd = cmd.strip()
+        if cmd:
+            normalized.append(cmd)
+    return normalized
+
+
+def _log_on_error(phase: str) -> Callable:
+    """Log a failed command generation for phase on self.logger, then re-raise."""
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.error("Failed to generate %s commands: %s", phase, e)
+                raise
+
+        return wrapper
+
+    return decorator
+
+
+@dataclass(frozen=True, slots=True)
+class _IvyPaths:
+    """Configuration-derived paths shared by the compile-phase command builders."""
+
+    use_system_models: bool
+    base: Optional[str]
+    build_dir: str
+
 
 class IvyCommandMixin:
     """
@@ -31,16 +167,39 @@ class IvyCommandMixin:
         self.command_builder = None
         self._initialize_command_builder()
 
+        # Optional event hooks provided by the service manager base classes,
+        # resolved once so command generation does not re-probe them per call
+        self._emit_cmd_gen_started = getattr(
+            self, "emit_command_generation_started", None
+        )
+        self._notify_service_event = getattr(self, "notify_service_event", None)
+        self._emit_cmd_generated = getattr(self, "emit_command_generated", None)
+        self._preprocess_network_context = getattr(
+            self, "preprocess_template_context_with_network_resolution", None
+        )
+
     def _initialize_command_builder(self):
         """Initialize ServiceCommandBuilder if role is available."""
-        if not self.command_builder and hasattr(self, "role"):
-            role = getattr(self, "role", None)
-            if role:
-                self.command_builder = ServiceCommandBuilder(role)
-            else:
-                self.logger.warning(
-                    "No role available for ServiceCommandBuilder initialization"
-                ) if hasattr(self, "logger") else None
+        if self.command_builder:
+            return
+        role = getattr(self, "role", _MISSING)
+        if role is _MISSING:
+            return
+        if role:
+            self.command_builder = ServiceCommandBuilder(role)
+        elif (logger := getattr(self, "logger", None)) is not None:
+            logger.warning("No role available for ServiceCommandBuilder initialization")
+
+    def _reset_command_caches(self) -> None:
+        """Drop every config-derived value cached by the command builders.
+
+        Called whenever the service configuration is (re)applied so the next
+        phase call recomputes the paths and setup commands once.
+        """
+        self._use_system_models = None
+        self._build_dir = None
+        self._paths = None
+        self._setup_cmds_cache = {}
 
     def generate_ivy_pre_compile_commands(self) -> List[Union[str, ShellCommand]]:
         """
@@ -49,33 +208,25 @@ class IvyCommandMixin:
         Returns:
             List of command strings
         """
-        commands = []
-
-        # Initialize environment file for logging -> use phase-based structure
-        commands.append(
-            "echo '# Ivy setup log' >>  /app/logs/pre-compile/ivy_setup.log"
-        )
-
         # Network resolution is handled by placeholders
         target_info = ""
-        if hasattr(self, "service_targets") and self.service_targets:
-            target_info = f" (target: {self.service_targets})"
-
-        commands.append(
-            f'echo "Ivy service {self.service_name} using network-aware placeholder resolution{target_info}" >> /app/logs/pre-compile/ivy_setup.log'
-        )
+        if service_targets := getattr(self, "service_targets", None):
+            target_info = f" (target: {service_targets})"
 
         # Clean build directory (safe operation - create directory if missing and clean)
-        use_system_models = getattr(
-            self.service_config_to_test.implementation, "use_system_models", False
-        )
-        env_protocol_path = self.get_protocol_model_path(use_system_models)
-        commands.append(
-            f"mkdir -p '{env_protocol_path}/build/' && find '{env_protocol_path}/build/' -maxdepth 1 -type f -delete 2>/dev/null || true"
-        )
+        paths = self._resolve_paths()
+        env_protocol_path = self.get_protocol_model_path(paths.use_system_models)
+
+        commands = [
+            # Initialize environment file for logging -> use phase-based structure
+            _PRE_COMPILE_LOG_HEADER,
+            f'echo "Ivy service {self.service_name} using network-aware placeholder resolution{target_info}" >> /app/logs/pre-compile/ivy_setup.log',
+            f"mkdir -p '{env_protocol_path}/build/' && find '{env_protocol_path}/build/' -maxdepth 1 -type f -delete 2>/dev/null || true",
+        ]
 
         return self.phase_command_processed(commands, "pre-compile")
 
+    @_log_on_error("compile")
     def generate_ivy_compile_commands(self) -> List[Union[str, ShellCommand]]:
         """
         Generate compilation commands including Ivy tool updates and test compilation.
@@ -83,51 +234,42 @@ class IvyCommandMixin:
         Returns:
             List of command strings
         """
-        commands = []
-
-        try:
-            # Emit command generation started event (if available)
-            if hasattr(self, "emit_command_generation_started"):
-                self.emit_command_generation_started("compile")
-
-            # Build comprehensive compilation commands
-            compilation_commands = self._generate_comprehensive_compilation_commands()
-            commands.extend(compilation_commands)
-
-            # Notify compilation started (if available)
-            if hasattr(self, "notify_service_event"):
-                protocol_name = self.get_protocol_name()
-                test_to_compile = getattr(self, "test_to_compile", "unknown_test")
-                self.notify_service_event(
-                    "compilation_started",
-                    {
-                        "protocol": protocol_name,
-                        "test": test_to_compile,
-                    },
-                )
-
-            # Signal ivy compilation completion to coordination system
-            service_name = getattr(self, "service_name", "ivy")
-            ready_commands = [
-                f'echo "Ivy compilation completed for {service_name}" >> /app/logs/coordination.log',
-                f"touch /app/coordination/{service_name}_ivy_ready",
-                f'echo "ready_$(date +%s)" > /app/coordination/{service_name}_ivy_ready',
-            ]
+        # Emit command generation started event (if available)
+        if self._emit_cmd_gen_started is not None:
+            self._emit_cmd_gen_started("compile")
+
+        # Build comprehensive compilation commands
+        compilation_commands = self._generate_comprehensive_compilation_commands()
+
+        # Notify compilation started (if available)
+        if self._notify_service_event is not None:
+            protocol_name = self.get_protocol_name()
+            test_to_compile = getattr(self, "test_to_compile", "unknown_test")
+            self._notify_service_event(
+                "compilation_started",
+                {
+                    "protocol": protocol_name,
+                    "test": test_to_compile,
+                },
+            )
 
-            if compilation_commands:
-                commands.extend(ready_commands)
-            else:
-                commands = ready_commands
+        # Signal ivy compilation completion to coordination system
+        service_name = getattr(self, "service_name", "ivy")
+        commands = [
+            *compilation_commands,
+            f'echo "Ivy compilation completed for {service_name}" >> /app/logs/coordination.log',
+            f"touch /app/coordination/{service_name}_ivy_ready",
+            f'echo "ready_$(date +%s)" > /app/coordination/{service_name}_ivy_ready',
+        ]
 
-            # Emit command generated event (if available)
-            if hasattr(self, "emit_command_generated"):
-                self.emit_command_generated("compile", str(commands))
+        # Emit command generated event (if available). The payload stays a
+        # plain str for event consumers; it is only built when a hook exists.
+        if self._emit_cmd_generated is not None:
+            self._emit_cmd_generated("compile", str(commands))
 
-            return self.phase_command_processed(commands, "compile")
-        except Exception as e:
-            self.logger.error(f"Failed to generate compile commands: {e}")
-            raise
+        return self.phase_command_processed(commands, "compile")
 
+    @_log_on_error("deployment")
     def generate_ivy_deployment_commands(self) -> str:
         """
         Generate deployment command arguments for Ivy test execution.
@@ -135,277 +277,259 @@ class IvyCommandMixin:
         Returns:
             str: Command arguments for test execution
         """
-        try:
-            self.logger.debug(
-                f"Generating deployment commands for service: {getattr(self, 'service_name', 'unknown')}"
+        self.logger.debug(
+            "Generating deployment commands for service: %s",
+            getattr(self, "service_name", "unknown"),
+        )
+
+        # Get role from service manager
+        role = getattr(self, "role", None)
+        if not role:
+            self.logger.warning("No role found in service manager")
+            raise ValueError("Role is required for deployment command generation")
+
+        # Get service configuration
+        service_config = getattr(self, "service_config_to_test", None)
+        if not service_config:
+            self.logger.warning("No service configuration found")
+            raise ValueError(
+                "Service configuration is required for deployment command generation"
             )
 
-            # Get role from service manager
-            role = getattr(self, "role", None)
-            if not role:
-                self.logger.warning("No role found in service manager")
-                raise ValueError("Role is required for deployment command generation")
+        role_name = getattr(role, "name", None) or str(role)
+        self.logger.debug("Role name: %s", role_name)
 
-            # Get service configuration
-            service_config = getattr(self, "service_config_to_test", None)
-            if not service_config:
-                self.logger.warning("No service configuration found")
-                raise ValueError(
-                    "Service configuration is required for deployment command generation"
-                )
+        impl = getattr(service_config, "implementation", None)
+        implem_version = getattr(impl, "version", _MISSING)
+        if implem_version is not _MISSING:
+            self.logger.debug("Version is: %s", implem_version)
+
+        # Get version and role-specific parameters
+        params = self._resolve_version_params(
+            getattr(impl, "version_config", _MISSING), role_name
+        )
+
+        # Add additional parameters from implementation
+        impl_params = getattr(impl, "parameters", None)
+        if (impl_param_attrs := getattr(impl_params, "__dict__", None)) is not None:
+            _merge_param_values(params, impl_param_attrs, _impl_param_value)
+
+        # Get service name -> this is critical and must not be None
+        service_name = getattr(self, "service_name", None)
+        if not service_name:
+            self.logger.error("Service name is not set in service manager")
+            raise ValueError(
+                "Service name is required for network placeholder resolution"
+            )
 
-            # Get role-specific parameters
-            params = {}
-            role_name = role.name if hasattr(role, "name") else str(role)
-            self.logger.debug(f"Role name: {role_name}")
-
-            # First, get parameters from the version config 'parameters' section
-            if (
-                hasattr(service_config, "implementation")
-                and service_config.implementation.version_config
-            ):
-                version_config = service_config.implementation.version_config
+        # Additional validation to ensure it's not None or empty string
+        if not isinstance(service_name, str):
+            service_name = str(service_name)
+        service_name = service_name.strip()
+        if service_name in _INVALID_PARAM_VALUES:
+            self.logger.error(
+                "Invalid service name: '%s' -> must be a valid service identifier",
+                service_name,
+            )
+            raise ValueError(
+                f"Service name '{service_name}' is invalid for network placeholder resolution"
+            )
+
+        params["service_name"] = service_name
+
+        # Get target service name
+        target = None
+
+        # First check protocol configuration
+        if protocol_config := getattr(service_config, "protocol", None):
+            self.logger.debug("Protocol config available: %s", protocol_config)
+            protocol_target = getattr(protocol_config, "target", _MISSING)
+            if protocol_target is not _MISSING:
+                target = protocol_target
+                self.logger.info("Using target from protocol config: %s", target)
+
+        # If no target from protocol, check service_targets
+        if not target:
+            target = getattr(self, "service_targets", None)
+            if target:
+                self.logger.info("Using target from service_targets: %s", target)
+
+        # Validate target -> for ivy services, we need a target
+        if not target:
+            if role_name == "client":
+                self.logger.warning(
+                    "No target service specified for network resolution"
+                )
+                raise ValueError("Target service must be specified for Ivy client role")
+            # Fallback to hardcoded defaults
+            if role_name == "server":
+                target = "ivy_server"  # Default server service name
+
+        params["target"] = target
+        params["role"] = role_name
+        params["implementation"] = self.implementation_name
+        params["is_server"] = role_name == "server"
+        # Ivy role inversion: when testing a server IUT, Ivy acts as client.
+        # is_client means "Ivy acts as client in this test", NOT "the IUT is a client".
+        opposite_role = oppose_role(role_name)
+        params["is_client"] = opposite_role == "client"
+        params["test_name"] = self.test_to_compile
+        params["timeout_cmd"] = f"timeout {service_config.timeout} "
+
+        # Validate critical parameters before template rendering; the
+        # per-parameter diagnostics only run when the quick check fails
+        # (service_name was already checked against the same sentinels)
+        if not target or str(target) in _INVALID_PARAM_VALUES:
+            self._check_critical_params(params)
+
+        # Use template rendering to generate arguments
+        template_name = f"{opposite_role}_command.jinja"
+
+        if template_renderer := getattr(self, "template_renderer", None):
+            # Preprocess template context to resolve network placeholders
+            if self._preprocess_network_context is not None:
+                params = self._preprocess_network_context(params)
                 self.logger.debug(
-                    f"Found version_config: {type(version_config)} - {version_config}"
+                    "Preprocessed template context with network resolution"
                 )
 
-                # version_config is now a dictionary, extract parameters
-                if isinstance(version_config, dict) and "parameters" in version_config:
-                    version_params = version_config["parameters"]
+            cmd_args = template_renderer.render_template(template_name, params)
+
+            # Validate and decode rendered command
+            if cmd_args:
+                # Leftover Jinja markers mean the render itself went wrong;
+                # reject those before the structural validation
+                if _UNRENDERED_TEMPLATE_RE.search(cmd_args):
+                    self.logger.warning(
+                        "Rendered command still contains template markers: %s",
+                        cmd_args,
+                    )
+                    raise ValueError(
+                        "Generated command arguments contain unrendered template"
+                        " markers"
+                    )
+                is_valid, corrected_cmd_args = self._validate_deployment_command(
+                    cmd_args
+                )
+                if is_valid:
+                    corrected_cmd_args = corrected_cmd_args.strip()
                     self.logger.debug(
-                        f"Extracting version parameters: {version_params}"
+                        "Generated command args from template: %s",
+                        corrected_cmd_args,
                     )
+                    return corrected_cmd_args
                 else:
-                    self.logger.warning(
-                        f"No 'parameters' found in version_config: {version_config}"
-                    )
-                    version_params = {}
+                    self.logger.warning("Command arguments validation failed")
+                    raise ValueError("Generated command arguments are invalid")
+            else:
+                self.logger.warning("No command arguments generated from template")
+                raise ValueError("Generated command arguments are empty")
+        else:
+            self.logger.warning("No template renderer available")
+            raise ValueError("No template renderer available")
 
-                if isinstance(version_params, dict):
-                    # If it's a dictionary
-                    self.logger.debug("Processing version_params as dictionary")
+    def _resolve_version_params(
+        self, version_config: Any, role_name: str
+    ) -> Dict[str, Any]:
+        """Flatten version_config parameters and the role section into one dict."""
+        params = {}
+
+        # First, get parameters from the version config 'parameters' section
+        if version_config is not _MISSING and version_config:
+            self.logger.debug(
+                "Found version_config: %s - %s",
+                type(version_config),
+                version_config,
+            )
+
+            # version_config is now a dictionary, extract parameters
+            if isinstance(version_config, dict) and "parameters" in version_config:
+                version_params = version_config["parameters"]
+                self.logger.debug("Extracting version parameters: %s", version_params)
+            else:
+                self.logger.warning(
+                    "No 'parameters' found in version_config: %s", version_config
+                )
+                version_params = {}
+
+            if isinstance(version_params, dict):
+                self.logger.debug("Processing version_params as dictionary")
+                _merge_param_values(params, version_params, _version_param_value)
+                if self.logger.isEnabledFor(logging.DEBUG):
                     for param_name, param_data in version_params.items():
                         self.logger.debug(
-                            f"Processing param {param_name}: {param_data} (type: {type(param_data)})"
+                            "Processing param %s: %s (type: %s) -> %s",
+                            param_name,
+                            param_data,
+                            type(param_data),
+                            params[param_name],
                         )
-                        if isinstance(param_data, dict) and "value" in param_data:
-                            params[param_name] = param_data["value"]
-                            self.logger.debug(
-                                f"  -> Set {param_name} = {param_data['value']}"
-                            )
-                        else:
-                            params[param_name] = param_data
-                            self.logger.debug(f"  -> Set {param_name} = {param_data}")
-                else:
-                    self.logger.warning(
-                        f"version_params is neither dict nor object with __dict__: {type(version_params)}"
-                    )
             else:
                 self.logger.warning(
-                    "service_config.implementation.version_config not available for parameter extraction"
+                    "version_params is neither dict nor object with __dict__: %s",
+                    type(version_params),
                 )
+        else:
+            self.logger.warning(
+                "service_config.implementation.version_config not available for parameter extraction"
+            )
 
-            if hasattr(service_config, "implementation") and hasattr(
-                service_config.implementation, "version"
-            ):
-                implem_version = service_config.implementation.version
-                self.logger.debug(f"Version is: {implem_version}")
-
-            # Get role-specific parameters from version_config
-            if hasattr(service_config, "implementation") and hasattr(
-                service_config.implementation, "version_config"
-            ):
-                version_config = service_config.implementation.version_config
-
-                if role_name == "server":
-                    # Check for server parameters in dict or object
-                    server_params = None
-                    if isinstance(version_config, dict) and "server" in version_config:
-                        server_params = version_config["server"]
-                    elif hasattr(version_config, "server"):
-                        server_params = version_config.server
-
-                    if server_params:
-                        self.logger.debug(
-                            "Using server parameters from implementation version"
-                        )
-                        self.logger.debug(f"Server parameters: {server_params}")
-                        if isinstance(server_params, dict):
-                            params |= server_params
-                        elif hasattr(server_params, "__dict__"):
-                            params |= server_params.__dict__
-                    else:
-                        self.logger.warning(
-                            "No server parameters found in implementation version"
-                        )
-                        raise ValueError("No server parameters found")
+        # Get role-specific parameters from version_config
+        if version_config is not _MISSING and role_name in ("server", "client"):
+            # Check for role parameters in dict or object
+            if isinstance(version_config, dict):
+                role_params = version_config.get(role_name)
+            else:
+                role_params = getattr(version_config, role_name, None)
 
-                elif role_name == "client":
-                    # Check for client parameters in dict or object
-                    client_params = None
-                    if isinstance(version_config, dict) and "client" in version_config:
-                        client_params = version_config["client"]
-                    elif hasattr(version_config, "client"):
-                        client_params = version_config.client
+            if not role_params:
+                self.logger.warning(
+                    "No %s parameters found in implementation version", role_name
+                )
+                raise ValueError(f"No {role_name} parameters found")
 
-                    if client_params:
-                        self.logger.debug(
-                            "Using client parameters from implementation version"
-                        )
-                        self.logger.debug(f"Client parameters: {client_params}")
-                        if isinstance(client_params, dict):
-                            params |= client_params
-                        elif hasattr(client_params, "__dict__"):
-                            params |= client_params.__dict__
-                    else:
-                        self.logger.warning(
-                            "No client parameters found in implementation version"
-                        )
-                        raise ValueError("No client parameters found")
-
-            # Add additional parameters from implementation
-            if hasattr(service_config, "implementation") and hasattr(
-                service_config.implementation, "parameters"
-            ):
-                impl_params = service_config.implementation.parameters
-                if hasattr(impl_params, "__dict__"):
-                    for param_name, param_obj in impl_params.__dict__.items():
-                        if hasattr(param_obj, "value"):
-                            params[param_name] = param_obj.value
-                        else:
-                            params[param_name] = param_obj
-
-            # Get service name -> this is critical and must not be None
-            service_name = getattr(self, "service_name", None)
-            if not service_name:
-                self.logger.error("Service name is not set in service manager")
+            self.logger.debug(
+                "Using %s parameters from implementation version", role_name
+            )
+            self.logger.debug("%s parameters: %s", role_name.capitalize(), role_params)
+            if isinstance(role_params, dict):
+                params |= role_params
+            else:
+                params |= getattr(role_params, "__dict__", {})
+
+        return params
+
+    def _check_critical_params(self, params: Dict[str, Any]) -> None:
+        """Raise ValueError for the first missing or placeholder-like critical param."""
+        for param_name in _CRITICAL_PARAMS:
+            if param_name not in params:
+                self.logger.error(
+                    "Critical parameter '%s' is missing from template params",
+                    param_name,
+                )
                 raise ValueError(
-                    "Service name is required for network placeholder resolution"
+                    f"Parameter '{param_name}' is required for network placeholder resolution"
                 )
 
-            # Additional validation to ensure it's not None or empty string
-            if (
-                service_name == "None"
-                or service_name == ""
-                or not str(service_name).strip()
-            ):
+            param_value = params[param_name]
+            if param_value is None:
                 self.logger.error(
-                    f"Invalid service name: '{service_name}' -> must be a valid service identifier"
+                    "Critical parameter '%s' is None in template params", param_name
                 )
                 raise ValueError(
-                    f"Service name '{service_name}' is invalid for network placeholder resolution"
+                    f"Parameter '{param_name}' cannot be None for network placeholder resolution"
                 )
 
-            params["service_name"] = service_name
-
-            # Get target service name
-            target = None
-
-            # First check protocol configuration
-            if hasattr(service_config, "protocol") and service_config.protocol:
-                self.logger.debug(
-                    f"Protocol config available: {service_config.protocol}"
+            # Check for string representations of None or empty values
+            if str(param_value) in _INVALID_PARAM_VALUES:
+                self.logger.error(
+                    "Critical parameter '%s' has invalid value: '%s'",
+                    param_name,
+                    param_value,
+                )
+                raise ValueError(
+                    f"Parameter '{param_name}' cannot be '{param_value}' for network placeholder resolution"
                 )
-                if hasattr(service_config.protocol, "target"):
-                    target = service_config.protocol.target
-                    self.logger.info(f"Using target from protocol config: {target}")
-
-            # If no target from protocol, check service_targets
-            if not target:
-                target = getattr(self, "service_targets", None)
-                if target:
-                    self.logger.info(f"Using target from service_targets: {target}")
-
-            # Validate target -> for ivy services, we need a target
-            if not target:
-                if role_name == "client":
-                    self.logger.warning(
-                        "No target service specified for network resolution"
-                    )
-                    raise ValueError(
-                        "Target service must be specified for Ivy client role"
-                    )
-                # Fallback to hardcoded defaults
-                if role_name == "server":
-                    target = "ivy_server"  # Default server service name
-
-            params["target"] = target
-            params["role"] = role_name
-            params["implementation"] = self.implementation_name
-            params["is_server"] = role_name == "server"
-            # Ivy role inversion: when testing a server IUT, Ivy acts as client.
-            # is_client means "Ivy acts as client in this test", NOT "the IUT is a client".
-            params["is_client"] = oppose_role(role_name) == "client"
-            params["test_name"] = self.test_to_compile
-            params["timeout_cmd"] = f"timeout {service_config.timeout} "
-
-            # Validate critical parameters before template rendering
-            critical_params = ["service_name", "target"]
-            for param_name in critical_params:
-                if param_name not in params:
-                    self.logger.error(
-                        f"Critical parameter '{param_name}' is missing from template params"
-                    )
-                    raise ValueError(
-                        f"Parameter '{param_name}' is required for network placeholder resolution"
-                    )
-
-                param_value = params[param_name]
-                if param_value is None:
-                    self.logger.error(
-                        f"Critical parameter '{param_name}' is None in template params"
-                    )
-                    raise ValueError(
-                        f"Parameter '{param_name}' cannot be None for network placeholder resolution"
-                    )
-
-                # Check for string representations of None or empty values
-                if str(param_value) in {"None", "", "null", "undefined"}:
-                    self.logger.error(
-                        f"Critical parameter '{param_name}' has invalid value: '{param_value}'"
-                    )
-                    raise ValueError(
-                        f"Parameter '{param_name}' cannot be '{param_value}' for network placeholder resolution"
-                    )
-
-            # Use template rendering to generate arguments
-            template_name = f"{oppose_role(role_name)}_command.jinja"
-
-            if template_renderer := getattr(self, "template_renderer", None):
-                # Preprocess template context to resolve network placeholders
-                if hasattr(self, "preprocess_template_context_with_network_resolution"):
-                    params = self.preprocess_template_context_with_network_resolution(
-                        params
-                    )
-                    self.logger.debug(
-                        "Preprocessed template context with network resolution"
-                    )
-
-                cmd_args = template_renderer.render_template(template_name, params)
-
-                # Validate and decode rendered command
-                if cmd_args:
-                    is_valid, corrected_cmd_args = self._validate_deployment_command(
-                        cmd_args
-                    )
-                    if is_valid:
-                        self.logger.debug(
-                            f"Generated command args from template: {corrected_cmd_args.strip()}"
-                        )
-                        return corrected_cmd_args.strip()
-                    else:
-                        self.logger.warning("Command arguments validation failed")
-                        raise ValueError("Generated command arguments are invalid")
-                else:
-                    self.logger.warning("No command arguments generated from template")
-                    raise ValueError("Generated command arguments are empty")
-            else:
-                self.logger.warning("No template renderer available")
-                raise ValueError("No template renderer available")
-
-        except Exception as e:
-            self.logger.error(f"Failed to generate deployment commands: {e}")
-            raise
 
     def generate_ivy_post_run_commands(self) -> List[Union[str, ShellCommand]]:
         """
@@ -417,23 +541,19 @@ class IvyCommandMixin:
         commands = []
 
         # Copy test binary if needed
-        if (
-            hasattr(self, "test_to_compile")
-            and self.test_to_compile
-            and hasattr(self, "env_protocol_model_path")
-        ):
+        test_to_compile = getattr(self, "test_to_compile", None)
+        model_path = getattr(self, "env_protocol_model_path", None)
+        if test_to_compile and model_path is not None:
             # Get build directory
             tests_build_dir = self._get_build_dir()
-            test_path = os.path.join(
-                self.env_protocol_model_path, tests_build_dir, self.test_to_compile
-            )
+            # Container paths are always POSIX, whatever the host OS
+            test_path = posixpath.join(model_path, tests_build_dir, test_to_compile)
+            test_dir, test_name = posixpath.split(test_path)
 
-            commands.extend(
-                [
-                    f"cp '{test_path}' '/app/logs/artifacts/{self.test_to_compile}'",  # Use phase-based artifacts directory
-                    f"find '{os.path.dirname(test_path)}' -name '{os.path.basename(test_path)}*' -type f -delete 2>/dev/null || true",
-                ]
-            )
+            commands = [
+                f"cp '{test_path}' '/app/logs/artifacts/{test_to_compile}'",  # Use phase-based artifacts directory
+                f"find '{test_dir}' -name '{test_name}*' -type f -delete 2>/dev/null || true",
+            ]
 
         return self.phase_command_processed(commands, "post-run")
 
@@ -442,7 +562,9 @@ class IvyCommandMixin:
         Process commands for the phase command and log the processed commands.
 
         This method takes a list of commands and processes them, then logs the
-        structured command generation with the provided argument.
+        structured command generation with the provided argument. Every phase
+        generator returns through here, so it is the single place to override
+        when post-processing commands for all phases.
 
         Args:
             commands (list): List of commands to be processed.
@@ -452,69 +574,73 @@ class IvyCommandMixin:
             list: The processed commands.
         """
         processed_commands = self._process_commands(commands, phase)
-        CommandUtils.log_structured_command_generation(
-            self.logger, phase, processed_commands
-        )
+        # The structured log serializes the whole command list; skip it
+        # entirely when the logger would drop the record anyway
+        if self.logger.isEnabledFor(logging.INFO):
+            CommandUtils.log_structured_command_generation(
+                self.logger, phase, processed_commands
+            )
         return processed_commands
 
     def _build_ivy_update_commands(self) -> List[str]:
-        """Build Ivy tool update commands."""
-        commands = [
-            "echo 'Updating Ivy tool...' >> /app/logs/compile/ivy_setup.log",
-            "cd /opt/panther_ivy && sudo env PURE_PYTHON_BUILD=1 python3.10 -m pip install . >> /app/logs/compile/ivy_setup.log 2>&1",
-            "cd /opt/panther_ivy && if [ -f lib/libz3.so ]; then cp lib/libz3.so /opt/panther_ivy/ivy/z3/ && echo 'Copied libz3.so to ivy/z3/'; else echo 'No local libz3.so (z3_source=pip), skipping copy'; fi >> /app/logs/compile/ivy_setup.log 2>&1",
-            # Ensure target directories exist in the site-packages install
-            "mkdir -p \"$PYTHON_IVY_DIR/ivy/include/1.7\" \"$PYTHON_IVY_DIR/ivy/lib\" >> /app/logs/compile/ivy_setup.log 2>&1",
-            'echo "Copying updated Ivy files (from /opt/panther_ivy/ivy/include/1.7/) into $PYTHON_IVY_DIR/ivy/include/1.7/." >> /app/logs/compile/ivy_setup.log',
-            # Initialize copied files list for cleanup tracking
-            "echo '' > /app/logs/compile/copied_ivy_files.list",
-            "find '/opt/panther_ivy/ivy/include/1.7/' -type f -name '*.ivy' -exec echo {} ';' >> '/app/logs/compile/copied_ivy_files.list' 2>> /app/logs/compile/ivy_setup.log",
-            "find '/opt/panther_ivy/ivy/include/1.7/' -type f -name '*.ivy' -exec cp {} \"$PYTHON_IVY_DIR/ivy/include/1.7/\" ';' >> /app/logs/compile/ivy_setup.log 2>&1",
-            # Find and copy files while saving their destinations to the list
-            "echo 'Copied files saved to /app/logs/compile/copied_ivy_files.list for future cleanup' >> /app/logs/compile/ivy_setup.log",
-        ]
+        """Build Ivy tool update commands.
+
+        The sequence only depends on the protocol and the model paths, so it is
+        memoized on those; callers get a fresh list.
+        """
+        protocol_name = self.get_protocol_name()
+        paths = self._resolve_paths()
+        key = (
+            protocol_name,
+            paths.base,
+            paths.use_system_models,
+            getattr(self, "env_protocol_model_path", None),
+        )
+        cache = getattr(self, "_setup_cmds_cache", None)
+        if cache is None:
+            cache = self._setup_cmds_cache = {}
+        if (cached := cache.get(key)) is not None:
+            return list(cached)
 
         # Protocol-specific setup
-        if self.get_protocol_name() in ["quic", "apt"]:
-            commands.extend(self._build_quic_setup_commands())
+        if protocol_name in _QUIC_LIKE_PROTOCOLS:
+            quic_commands = self._build_quic_setup_commands()
+        else:
+            quic_commands = ()
 
         # Set up Ivy model
-        commands.extend(self._build_ivy_model_setup_commands())
-
-        return commands
+        commands = (
+            *_IVY_UPDATE_COMMANDS,
+            *quic_commands,
+            *self._build_ivy_model_setup_commands(),
+        )
+        cache[key] = commands
+        return list(commands)
 
     def _build_quic_setup_commands(self) -> List[str]:
         """Build QUIC-specific setup commands."""
-        commands = [
-            "echo 'Copying QUIC libraries...' >> /app/logs/compile/ivy_setup.log",
-            "cp -f -a '/opt/picotls/'*.a $PYTHON_IVY_DIR/ivy/lib/ >> /app/logs/compile/ivy_setup.log 2>&1",
-            "cp -f -a '/opt/picotls/'*.a '/opt/panther_ivy/ivy/lib/'  >> /app/logs/compile/ivy_setup.log 2>&1",
-            "cp -f '/opt/picotls/include/picotls.h' $PYTHON_IVY_DIR/ivy/include/picotls.h >> /app/logs/compile/ivy_setup.log 2>&1",
-            "cp -f '/opt/picotls/include/picotls.h' '/opt/panther_ivy/ivy/include/picotls.h' >> /app/logs/compile/ivy_setup.log 2>&1",
-            "cp -r -f '/opt/picotls/include/picotls/.' $PYTHON_IVY_DIR/ivy/include/picotls >> /app/logs/compile/ivy_setup.log 2>&1",
-        ]
+        commands = list(_QUIC_LIBRARY_COMMANDS)
 
-        if hasattr(self, "env_protocol_model_path"):
+        paths = self._resolve_paths()
+        if paths.base is not None:
             # Add quic_ser_deser.h copy
-            use_system_models = getattr(
-                self.service_config_to_test.implementation, "use_system_models", False
-            )
-            if use_system_models:
-                quic_ser_deser_path = f"{self.env_protocol_model_path}/apt_protocols/quic/quic_utils/quic_ser_deser.h"
-            else:
+            if paths.use_system_models:
                 quic_ser_deser_path = (
-                    f"{self.env_protocol_model_path}/quic_utils/quic_ser_deser.h"
+                    f"{paths.base}/apt_protocols/quic/quic_utils/quic_ser_deser.h"
                 )
+            else:
+                quic_ser_deser_path = f"{paths.base}/quic_utils/quic_ser_deser.h"
 
             commands.append(
-                f"cp -f '{quic_ser_deser_path}' $PYTHON_IVY_DIR/ivy/include/1.7/ >> /app/logs/compile/ivy_setup.log 2>&1"
+                f"cp -f '{quic_ser_deser_path}' {_IVY_INCLUDE_DIR}/ >> /app/logs/compile/ivy_setup.log 2>&1"
             )
 
         return commands
 
     def _build_ivy_model_setup_commands(self) -> List[str]:
         """Build Ivy model setup commands."""
-        if not hasattr(self, "env_protocol_model_path"):
+        model_path = getattr(self, "env_protocol_model_path", None)
+        if model_path is None:
             self.logger.warning(
                 "env_protocol_model_path is not set — skipping Ivy model setup commands"
             )
@@ -522,12 +648,12 @@ class IvyCommandMixin:
 
         commands = [
             "echo 'Setting up Ivy model...' >> /app/logs/compile/ivy_setup.log",
-            f"echo 'Updating include path from {self.env_protocol_model_path}' >> /app/logs/compile/ivy_setup.log",
+            f"echo 'Updating include path from {model_path}' >> /app/logs/compile/ivy_setup.log",
             "find '"
-            + self.env_protocol_model_path
+            + model_path
             + "' -type f -name '*.ivy' -exec echo {} ';' >> '/app/logs/compile/copied_ivy_files.list' 2>> /app/logs/compile/ivy_setup.log",
             "find '"
-            + self.env_protocol_model_path
+            + model_path
             + "' -type f -name '*.ivy' -exec cp -f {} $PYTHON_IVY_DIR/ivy/include/1.7/ ';' >> /app/logs/compile/ivy_setup.log 2>&1",
             "ls -l $PYTHON_IVY_DIR/ivy/include/1.7/ >> /app/logs/compile/ivy_setup.log",
         ]
@@ -542,17 +668,17 @@ class IvyCommandMixin:
             List[str]: Command sequence for test compilation
         """
         # System (APT) models don't need test compilation
-        use_system_models = getattr(
-            self.service_config_to_test.implementation, "use_system_models", False
-        )
-        if use_system_models:
+        paths = self._resolve_paths()
+        if paths.use_system_models:
             return []
 
-        container_base_path = self.env_protocol_model_path
+        container_base_path = paths.base
+        tests_build_dir = paths.build_dir
+        test_to_compile = self.test_to_compile
 
         # Get role information
         role = self.role
-        role_name = role.name if hasattr(role, "name") else str(role)
+        role_name = getattr(role, "name", None) or str(role)
         protocol_name = self.get_protocol_name()
 
         # Get internal iterations from PantherIvyConfig (set via YAML config)
@@ -561,88 +687,95 @@ class IvyCommandMixin:
             service_config, "internal_iterations_per_test", 300
         )
         self.logger.debug(
-            f"Test compilation config: internal_iterations={internal_iterations}, "
-            f"role={role_name}, protocol={protocol_name}"
+            "Test compilation config: internal_iterations=%s, role=%s, protocol=%s",
+            internal_iterations,
+            role_name,
+            protocol_name,
         )
 
         # Construct test directory path (use_system_models already returned early)
-        test_dir = self._extract_test_directory_from_name(
-            self.test_to_compile, role_name
+        test_dir = self._extract_test_directory_from_name(test_to_compile, role_name)
+        # Both components below are fixed relative names, so plain
+        # concatenation is equivalent to posixpath.join here
+        container_file_path = (
+            f"{container_base_path.rstrip('/')}/{protocol_name}_tests/{test_dir}"
         )
-        container_file_path = os.path.join(
-            container_base_path, f"{protocol_name}_tests", test_dir
-        )
-
-        self.logger.info(f"Container path for test compilation: {container_file_path}")
 
-        # Get build directory
-        tests_build_dir = self._get_build_dir()
+        self.logger.info("Container path for test compilation: %s", container_file_path)
 
         return [
-            f"echo 'Compiling test {self.test_to_compile} into {container_file_path}/{tests_build_dir}' >> /app/logs/compile/ivy_compile.log",
+            f"echo 'Compiling test {test_to_compile} into {container_file_path}/{tests_build_dir}' >> /app/logs/compile/ivy_compile.log",
             f"mkdir -p '{container_base_path}/{tests_build_dir}'",
-            f"cd $PYTHON_IVY_DIR/ivy/include/1.7 && pwd >> /app/logs/compile/ivy_compile.log 2>&1 && ls -la >> /app/logs/compile/ivy_compile.log 2>&1 && echo $PATH && ivyc show_compiled=false trace=false target=test test_iters={internal_iterations} {self.test_to_compile}.ivy >> /app/logs/compile/ivy_compile.log 2>&1",
+            f"cd {_IVY_INCLUDE_DIR} && pwd >> /app/logs/compile/ivy_compile.log 2>&1 && ls -la >> /app/logs/compile/ivy_compile.log 2>&1 && echo $PATH && ivyc show_compiled=false trace=false target=test test_iters={internal_iterations} {test_to_compile}.ivy >> /app/logs/compile/ivy_compile.log 2>&1",
             "COMPILE_RESULT=$?",
             '(if [ "$'
             + '{COMPILE_RESULT:-0}" -eq 0 ] 2>/dev/null; then echo "Compilation succeeded"; else echo "Compilation failed with code $'
             + '{COMPILE_RESULT:-unknown}"; fi) > /app/logs/compile/compilation_status.txt',
             "echo 'Copying executable from ivy include to build directory...' >> /app/logs/compile/ivy_compile.log",
-            f"cp $PYTHON_IVY_DIR/ivy/include/1.7/{self.test_to_compile} {container_base_path}/{tests_build_dir}/ >> /app/logs/compile/ivy_compile.log 2>&1",
+            f"cp {_IVY_INCLUDE_DIR}/{test_to_compile} {container_base_path}/{tests_build_dir}/ >> /app/logs/compile/ivy_compile.log 2>&1",
             "echo 'Copying executable from ivy include to outputs directory...' >> /app/logs/compile/ivy_compile.log",
-            f"cp $PYTHON_IVY_DIR/ivy/include/1.7/{self.test_to_compile} /app/logs/compile/{self.test_to_compile} 2>&1",
-            f"cp $PYTHON_IVY_DIR/ivy/include/1.7/{self.test_to_compile}.cpp  /app/logs/compile/{self.test_to_compile}.cpp  2>&1",
-            f"cp $PYTHON_IVY_DIR/ivy/include/1.7/{self.test_to_compile}.h  /app/logs/compile/{self.test_to_compile}.h  2>&1",
+            f"cp {_IVY_INCLUDE_DIR}/{test_to_compile} /app/logs/compile/{test_to_compile} 2>&1",
+            f"cp {_IVY_INCLUDE_DIR}/{test_to_compile}.cpp  /app/logs/compile/{test_to_compile}.cpp  2>&1",
+            f"cp {_IVY_INCLUDE_DIR}/{test_to_compile}.h  /app/logs/compile/{test_to_compile}.h  2>&1",
             f"ls -la {container_base_path}/{tests_build_dir}/ >> /app/logs/compile/ivy_compile.log",
         ]
 
     def _extract_test_directory_from_name(self, test_name: str, role_name: str) -> str:
         """Extract test directory from test name."""
-        if "client" in test_name.lower():
-            return "client_tests"
-        elif "server" in test_name.lower():
-            return "server_tests"
-        else:
-            # Fallback to opposite role
-            return f"{oppose_role(role_name)}_tests"
+        return _test_directory_for(test_name, role_name)
 
     def _get_build_dir(self) -> str:
-        """Get build directory from configuration with robust extraction."""
-        service_config = getattr(self, "service_config_to_test", None)
+        """Get build directory from configuration, resolved once per instance."""
+        if getattr(self, "_build_dir", None) is None:
+            self._build_dir = self._resolve_build_dir()
+        return self._build_dir
 
-        if service_config and hasattr(service_config, "implementation"):
-            impl = service_config.implementation
-
-            # Path 1: Direct access to implementation parameters
-            if hasattr(impl, "parameters") and impl.parameters:
-                params = impl.parameters
-                if hasattr(params, "tests_build_dir"):
-                    param_value = params.tests_build_dir
-                    if hasattr(param_value, "value"):
-                        return str(param_value.value)
-                    return str(param_value)
-
-            # Path 2: Check version parameters
-            if hasattr(impl, "version") and hasattr(impl.version, "parameters"):
-                version_params = impl.version.parameters
-                if hasattr(version_params, "tests_build_dir"):
-                    param_value = version_params.tests_build_dir
-                    if hasattr(param_value, "value"):
-                        return str(param_value.value)
-                    return str(param_value)
-
-            # Path 3: Direct attribute check on implementation
-            if hasattr(impl, "tests_build_dir"):
-                param_value = impl.tests_build_dir
-                if hasattr(param_value, "value"):
-                    return str(param_value.value)
-                return str(param_value)
+    def _resolve_build_dir(self) -> str:
+        """Get build directory from configuration with robust extraction."""
+        impl = getattr(
+            getattr(self, "service_config_to_test", None), "implementation", None
+        )
+        if impl is None:
+            return "build"
+
+        # Checked in order: implementation parameters, version parameters,
+        # then a direct attribute on the implementation
+        sources = (
+            getattr(impl, "parameters", None) or None,
+            getattr(getattr(impl, "version", None), "parameters", None),
+            impl,
+        )
+        for source in sources:
+            param_value = getattr(source, "tests_build_dir", _MISSING)
+            if param_value is not _MISSING:
+                return str(getattr(param_value, "value", param_value))
 
         return "build"
 
+    def _uses_system_models(self) -> bool:
+        """Return the implementation's use_system_models flag, read once."""
+        if getattr(self, "_use_system_models", None) is None:
+            impl = getattr(
+                getattr(self, "service_config_to_test", None), "implementation", None
+            )
+            self._use_system_models = bool(getattr(impl, "use_system_models", False))
+        return self._use_system_models
+
+    def _resolve_paths(self) -> _IvyPaths:
+        """Resolve the compile-phase paths once per instance."""
+        if getattr(self, "_paths", None) is None:
+            self._paths = _IvyPaths(
+                use_system_models=self._uses_system_models(),
+                base=getattr(self, "env_protocol_model_path", None),
+                build_dir=self._get_build_dir(),
+            )
+        return self._paths
+
     def _generate_comprehensive_compilation_commands(self) -> List[str]:
         """Generate comprehensive compilation commands."""
         self.logger.debug(
-            f"Generating compilation commands for service: {getattr(self, 'service_name', 'unknown')}"
+            "Generating compilation commands for service: %s",
+            getattr(self, "service_name", "unknown"),
         )
 
         # Set up environments
@@ -654,30 +787,22 @@ class IvyCommandMixin:
             )
 
         # Get environment configurations
-        protocol_env = {}
-
-        if hasattr(service_config, "implementation") and (
-            hasattr(service_config.implementation, "version")
-            and hasattr(service_config.implementation.version, "env")
-        ):
-            protocol_env = service_config.implementation.version.env or {}
+        impl = getattr(service_config, "implementation", None)
+        protocol_env = getattr(getattr(impl, "version", None), "env", None) or {}
 
         # Adjust protocol environment for non-system models
-        use_system_models = (
-            getattr(service_config.implementation, "use_system_models", False)
-            if hasattr(service_config, "implementation")
-            else False
-        )
-        if not use_system_models:
-            for key in protocol_env:
-                if isinstance(protocol_env[key], str):
-                    protocol_env[key] = protocol_env[key].replace(
-                        "/apt/apt_protocols", ""
-                    )
+        if not self._resolve_paths().use_system_models:
+            protocol_env.update(
+                {
+                    key: value.replace("/apt/apt_protocols", "")
+                    for key, value in protocol_env.items()
+                    if isinstance(value, str) and "/apt/apt_protocols" in value
+                }
+            )
 
         # Set test path
         test_to_compile = getattr(self, "test_to_compile", None)
-        self.logger.info(f"Setting test path to: {test_to_compile}")
+        self.logger.info("Setting test path to: %s", test_to_compile)
 
         # Build Ivy tool update commands
         update_commands = self._build_ivy_update_commands()
@@ -685,46 +810,40 @@ class IvyCommandMixin:
         # Build test compilation commands
         test_commands = self._build_test_compilation_commands()
 
-        return update_commands + test_commands
+        update_commands += test_commands
+        return update_commands
 
     def _process_commands(
         self, commands: List[Union[str, ShellCommand]], phase: str
     ) -> List[Union[str, ShellCommand]]:
         """Process commands through ServiceCommandBuilder."""
+        # Normalized once; also the fallback result if the builder fails
+        commands = _strip_commands(commands)
+
         # Ensure command builder is initialized
         if not self.command_builder:
             # Fallback if no command builder available
-            return [cmd.strip() for cmd in commands if cmd and cmd.strip()]
+            return commands
         try:
             # Reset builder to start fresh
             self.command_builder.reset()
 
+            # TODO: or "pre-compile" in phase ?
+            # A command is critical if we're in compile phase AND it's not a simple echo/ls command
+            compile_phase = "compile" in phase
+
             # Add commands to builder
             for cmd in commands:
-                if cmd and isinstance(cmd, str):
-                    # Determine if this is a non-critical command like ls or echo
-                    is_non_critical_command = cmd.strip().startswith(("ls", "echo"))
-
-                    # TODO: or "pre-compile" in phase ?
-                    # A command is critical if we're in compile phase AND it's not a simple echo/ls command
-                    is_critical = ("compile" in phase) and not is_non_critical_command
-
-                    self.command_builder.add_command(
-                        cmd.strip(),
-                        is_critical=is_critical,
-                    )
+                if isinstance(cmd, str):
+                    is_critical = compile_phase and not cmd.startswith(_NON_CRITICAL)
+                    self.command_builder.add_command(cmd, is_critical=is_critical)
                 elif isinstance(cmd, ShellCommand):
-                    # Determine if this is a non-critical command like ls or echo
-                    is_non_critical_command = cmd.command.strip().startswith(
-                        ("ls", "echo")
+                    command = cmd.command.strip()
+                    is_critical = compile_phase and not command.startswith(
+                        _NON_CRITICAL
                     )
-
-                    # A command is critical if we're in compile/pre-compile phase AND it's not a simple echo/ls command
-                    is_critical = ("compile" in phase) and not is_non_critical_command
-
                     cmd.metadata["is_critical"] = is_critical
-
-                    self.command_builder.add_command(cmd.command.strip(), cmd.metadata)
+                    self.command_builder.add_command(command, cmd.metadata)
 
             # Process and return commands
             processed = self.command_builder.process_commands("panther_ivy")
@@ -735,11 +854,13 @@ class IvyCommandMixin:
 
         except Exception as e:
             self.logger.error(
-                f"Command processing failed for phase '{phase}': {e}. "
-                f"Falling back to raw commands (error detection may be impaired).",
+                "Command processing failed for phase '%s': %s. "
+                "Falling back to raw commands (error detection may be impaired).",
+                phase,
+                e,
                 exc_info=True,
             )
-            return [cmd.strip() for cmd in commands if cmd and cmd.strip()]
+            return commands
 
     def _validate_deployment_command(self, cmd_args: str) -> tuple[bool, str]:
         """Validate deployment command for common issues.
@@ -749,44 +870,46 @@ class IvyCommandMixin:
         """
         validation_errors = []
 
-        self.logger.debug(f"Validating command arguments: {cmd_args}")
-
-        # Decode HTML entities first
-        import html
+        self.logger.debug("Validating command arguments: %s", cmd_args)
 
-        decoded_cmd_args = html.unescape(cmd_args)
-        if decoded_cmd_args != cmd_args:
-            self.logger.debug(f"Decoded HTML entities in command: {decoded_cmd_args}")
-            cmd_args = decoded_cmd_args
+        # Decode HTML entities first; every entity starts with '&'
+        if "&" in cmd_args:
+            decoded_cmd_args = html.unescape(cmd_args)
+            if decoded_cmd_args != cmd_args:
+                self.logger.debug(
+                    "Decoded HTML entities in command: %s", decoded_cmd_args
+                )
+                cmd_args = decoded_cmd_args
 
         # Check for @None placeholders
         if "@None" in cmd_args:
             validation_errors.append("Contains @None placeholders")
 
-        # Check for unbalanced braces
+        # Check for unbalanced braces. Two C-level str.count() scans are much
+        # cheaper than a single Python-level loop over every character.
         if cmd_args.count("{") != cmd_args.count("}"):
             validation_errors.append("Contains unbalanced braces")
 
         # Check for empty parameter values
-        empty_params = re.findall(r"(\w+)=\s*(?=\s|\}|$)", cmd_args)
+        empty_params = _EMPTY_PARAM_RE.findall(cmd_args)
         if empty_params:
             validation_errors.append(f"Contains empty parameters: {empty_params}")
 
         # Check for malformed placeholders - updated to handle service names with valid characters
-        valid_placeholder_pattern = (
-            r"@\{[a-zA-Z_][a-zA-Z0-9_]*:[a-zA-Z_][a-zA-Z0-9_]*:[a-zA-Z_][a-zA-Z0-9_]*\}"
-        )
-        all_placeholders = re.findall(r"@\{[^}]+\}", cmd_args)
-        if malformed := [
-            p for p in all_placeholders if not re.match(valid_placeholder_pattern, p)
-        ]:
+        if "@{" in cmd_args and (
+            malformed := [
+                m.group(0)
+                for m in _PLACEHOLDER_RE.finditer(cmd_args)
+                if not _is_valid_placeholder(m.group(1))
+            ]
+        ):
             validation_errors.append(f"Contains malformed placeholders: {malformed}")
 
         if validation_errors:
             self.logger.error(
-                f"Command validation failed: {', '.join(validation_errors)}"
+                "Command validation failed: %s", ", ".join(validation_errors)
             )
-            self.logger.error(f"Generated command: {cmd_args}")
+            self.logger.error("Generated command: %s", cmd_args)
             return False, cmd_args
 
         return True, cmd_args
@@ -795,9 +918,10 @@ class IvyCommandMixin:
         """Validate shell syntax for common errors."""
         errors = []
 
-        # Check for malformed redirections
-        malformed_redirections = re.findall(r">\d+/", cmd_args)
-        if malformed_redirections:
+        # Check for malformed redirections; most commands have no '>' at all
+        if ">" in cmd_args and (
+            malformed_redirections := _MALFORMED_REDIRECTION_RE.findall(cmd_args)
+        ):
             errors.append(
                 f"Malformed redirections: {malformed_redirections} (should be '2>/dev/null' or '> /dev/null 2>&1')"
             )
@@ -810,17 +934,14 @@ class IvyCommandMixin:
         if double_quotes % 2 != 0:
             errors.append("Unmatched double quotes")
 
-        # Check for missing spaces in command chains
-        if re.search(r"[^;]\s*;\s*[^;]", cmd_args):
-            # This is actually correct, so let's check for missing spaces around operators
-            pass
-
-        # Check for invalid path patterns
-        invalid_paths = re.findall(r"/[^/\s]*[^/\s\w.-][^/\s]*", cmd_args)
-        # Filter out valid special characters in paths
-        actual_invalid = [p for p in invalid_paths if not re.match(r"^/[\w./-]*$", p)]
-        if actual_invalid:
-            errors.append(f"Potentially invalid paths: {actual_invalid}")
+        # Check for invalid path patterns (only possible with a '/' present)
+        if "/" in cmd_args:
+            invalid_paths = _SUSPICIOUS_PATH_RE.findall(cmd_args)
+            # Filter out valid special characters in paths
+            if actual_invalid := [
+                p for p in invalid_paths if not _VALID_PATH_RE.fullmatch(p)
+            ]:
+                errors.append(f"Potentially invalid paths: {actual_invalid}")
 
         # Check for command substitution issues
         if "`" in cmd_args and cmd_args.count("`") % 2 != 0:
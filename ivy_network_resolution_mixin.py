@@ -7,7 +7,10 @@ to the correct target services based on experiment context and service roles.
 """
 
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# Matches role-based placeholders such as @{server_service:ip:decimal}
+_ROLE_PLACEHOLDER_RE = re.compile(r"@\{(\w+_service):([^:}]+):([^}]+)\}")
 
 
 class IvyNetworkResolutionMixin:
@@ -25,7 +28,7 @@ class IvyNetworkResolutionMixin:
         """Initialize network resolution mixin."""
         super().__init__(*args, **kwargs)
         self._network_placeholder_cache = {}
-        self._service_target_mapping = {}
+        self._role_mapping_cache = None
 
     def resolve_service_target_placeholders(
         self, template_context: Dict[str, Any]
@@ -41,32 +44,77 @@ class IvyNetworkResolutionMixin:
             template_context: Jinja template context with configuration parameters
 
         Returns:
-            Updated template context with resolved network placeholders
+            Updated template context with resolved network placeholders, or the
+            original context when it contains none
         """
         if not template_context:
             return template_context
 
-        # Get service targets from experiment context
-        service_targets = self._get_service_targets()
-
-        # Create mapping from roles to actual service names
-        role_to_service_mapping = self._build_role_to_service_mapping(service_targets)
+        # Mapping from roles to actual service names, resolved once per config
+        role_to_service_mapping = self._resolve_network_targets()[1]
 
-        # Clone context to avoid modifying original
-        resolved_context = template_context.copy()
+        # Clone context lazily, on the first resolved value, to avoid modifying
+        # the original; a context without placeholders is returned as is
+        resolved_context = template_context
 
         # Resolve placeholders in context values
         for key, value in template_context.items():
-            if isinstance(value, str):
+            if isinstance(value, str) and "@{" in value:
                 resolved_value = self._resolve_placeholders_in_string(
                     value, role_to_service_mapping
                 )
                 if resolved_value != value:
+                    if resolved_context is template_context:
+                        resolved_context = template_context.copy()
                     resolved_context[key] = resolved_value
-                    self.logger.debug(f"Resolved {key}: {value} -> {resolved_value}")
+                    self.logger.debug(
+                        "Resolved %s: %s -> %s", key, value, resolved_value
+                    )
 
         return resolved_context
 
+    def _network_cache_key(self) -> tuple:
+        """Return the key under which the resolved targets and mapping are cached."""
+        return (
+            repr(getattr(self, "service_targets", None)),
+            id(getattr(self, "_original_service_config", None)),
+            id(getattr(self, "global_config", None)),
+            repr(getattr(self, "role", None)),
+            getattr(self, "service_name", None),
+        )
+
+    def _resolve_network_targets(self) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Get the service targets and role mapping, rebuilt only when their inputs change.
+
+        Returns:
+            Tuple of (service targets, role-to-service mapping)
+        """
+        key = self._network_cache_key()
+        cached = getattr(self, "_role_mapping_cache", None)
+        if cached is None or cached[0] != key:
+            service_targets = self._get_service_targets()
+            role_mapping = self._build_role_to_service_mapping(service_targets)
+            # Configs are keyed by id(); keep them referenced while cached so
+            # an id cannot be reused by a different object
+            refs = (
+                getattr(self, "_original_service_config", None),
+                getattr(self, "global_config", None),
+            )
+            cached = (key, refs, service_targets, role_mapping)
+            self._role_mapping_cache = cached
+            # Resolved contexts were built from the previous mapping
+            self._network_placeholder_cache = {}
+        return cached[2], cached[3]
+
+    def invalidate_network_cache(self) -> None:
+        """Drop cached targets, role mapping and resolved contexts.
+
+        Call this after mutating service_targets or the global services in place.
+        """
+        self._role_mapping_cache = None
+        self._network_placeholder_cache = {}
+
     def _get_service_targets(self) -> List[str]:
         """
         Get list of target services for this ivy tester.
@@ -142,13 +190,7 @@ class IvyNetworkResolutionMixin:
                         targets.append(service_name)
 
         # Remove duplicates while preserving order
-        seen = set()
-        unique_targets = []
-
-        for target in targets:
-            if target not in seen:
-                seen.add(target)
-                unique_targets.append(target)
+        unique_targets = list(dict.fromkeys(targets))
 
         self.logger.debug(f"Resolved service targets: {unique_targets}")
         return unique_targets
@@ -209,14 +251,14 @@ class IvyNetworkResolutionMixin:
             String with resolved placeholders
         """
 
-        self.logger.debug(f"Resolving placeholders in text: {text}")
+        self.logger.debug("Resolving placeholders in text: %s", text)
         if not isinstance(text, str) or "@{" not in text:
             return text
 
-        resolved_text = text
-
-        # Pattern to match @{role_service:attribute:format}
-        placeholder_pattern = r"@\{(\w+_service):([^:}]+):([^}]+)\}"
+        # Unmapped roles resolve to themselves, so without any mapped role
+        # name in the text the substitution cannot change it
+        if not any(role in text for role in role_mapping):
+            return text
 
         def replace_placeholder(match):
             role_service = match.group(1)  # e.g., "server_service"
@@ -230,12 +272,11 @@ class IvyNetworkResolutionMixin:
             resolved_placeholder = f"@{{{actual_service}:{attribute}:{format_type}}}"
 
             self.logger.debug(
-                f"Resolved placeholder: {match.group(0)} -> {resolved_placeholder}"
+                "Resolved placeholder: %s -> %s", match.group(0), resolved_placeholder
             )
             return resolved_placeholder
 
-        resolved_text = re.sub(placeholder_pattern, replace_placeholder, resolved_text)
-        return resolved_text
+        return _ROLE_PLACEHOLDER_RE.sub(replace_placeholder, text)
 
     def get_network_placeholder_summary(self) -> Dict[str, Any]:
         """
@@ -244,14 +285,13 @@ class IvyNetworkResolutionMixin:
         Returns:
             Dictionary with placeholder resolution details
         """
-        service_targets = self._get_service_targets()
-        role_mapping = self._build_role_to_service_mapping(service_targets)
+        service_targets, role_mapping = self._resolve_network_targets()
 
         return {
             "ivy_service_name": getattr(self, "service_name", "unknown"),
             "ivy_role": getattr(self, "role", "unknown"),
-            "service_targets": service_targets,
-            "role_to_service_mapping": role_mapping,
+            "service_targets": list(service_targets),
+            "role_to_service_mapping": dict(role_mapping),
             "cache_size": len(self._network_placeholder_cache),
         }
 
@@ -270,16 +310,23 @@ class IvyNetworkResolutionMixin:
         Returns:
             Template context with resolved network placeholders
         """
-        # # Cache key for this context (simplified)
-        # cache_key = str(sorted(context.items()))
-
-        # if cache_key in self._network_placeholder_cache:
-        #     return self._network_placeholder_cache[cache_key]
-
-        # Resolve placeholders
-        resolved_context = self.resolve_service_target_placeholders(context)
-
-        # Cache result
-        # self._network_placeholder_cache[cache_key] = resolved_context
-
-        return resolved_context
+        if not context:
+            return context
+
+        # Cache key for this context; contexts with unhashable values
+        # (lists, dicts) are resolved without caching
+        try:
+            cache_key = frozenset(context.items())
+        except TypeError:
+            return self.resolve_service_target_placeholders(context)
+
+        # Refresh the role mapping first: a changed mapping drops the cache
+        self._resolve_network_targets()
+        if (resolved_context := self._network_placeholder_cache.get(cache_key)) is None:
+            resolved_context = self.resolve_service_target_placeholders(context)
+            # The resolver hands back the caller's own dict when nothing
+            # resolved; cache a private copy so later edits cannot leak in
+            self._network_placeholder_cache[cache_key] = dict(resolved_context)
+
+        # Callers extend the context before rendering; hand out a copy
+        return dict(resolved_context)
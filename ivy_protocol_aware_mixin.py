@@ -8,7 +8,14 @@ PantherIvy service manager, promoting code reuse and maintaining separation of c
 import logging
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+# Sentinel for getattr() lookups where None is a meaningful attribute value
+_MISSING = object()
+
+# Protocol models shipped next to this module, used when
+# PANTHER_IVY_LOCAL_BASE_PATH is not set
+_DEFAULT_LOCAL_BASE = Path(__file__).parent / "protocol-testing"
 
 
 class IvyProtocolAwareMixin:
@@ -19,8 +26,16 @@ class IvyProtocolAwareMixin:
     previously duplicated across multiple component files.
     """
 
+    # Class-level fallback only for code that runs before this __init__
     _protocol_name_cache: Optional[str] = None
 
+    def __init__(self, *args, **kwargs):
+        """Initialize the per-instance protocol name cache."""
+        # Set before the cooperative super() call so base initializers that
+        # resolve the protocol already read it from the instance dict
+        self._protocol_name_cache = None
+        super().__init__(*args, **kwargs)
+
     def get_protocol_name(self) -> str:
         """
         Centralized protocol name resolution with caching.
@@ -31,53 +46,44 @@ class IvyProtocolAwareMixin:
         if self._protocol_name_cache:
             return self._protocol_name_cache
 
+        logger = getattr(self, "logger", None)
         protocol_name = None
 
         # Method 1: Check self.protocol object
-        if hasattr(self, "protocol") and self.protocol:
-            if hasattr(self.protocol, "name"):
-                protocol_name = getattr(self.protocol, "name", None)
-                if hasattr(self, "logger"):
-                    self.logger.debug(
-                        f"Found protocol name from self.protocol.name: {protocol_name}"
+        if protocol := getattr(self, "protocol", None):
+            if (name := getattr(protocol, "name", _MISSING)) is not _MISSING:
+                protocol_name = name
+                if logger is not None:
+                    logger.debug(
+                        "Found protocol name from self.protocol.name: %s", protocol_name
                     )
-            elif isinstance(self.protocol, str):
-                protocol_name = self.protocol
-                if hasattr(self, "logger"):
-                    self.logger.debug(
-                        f"Found protocol name from self.protocol string: {protocol_name}"
+            elif isinstance(protocol, str):
+                protocol_name = protocol
+                if logger is not None:
+                    logger.debug(
+                        "Found protocol name from self.protocol string: %s",
+                        protocol_name,
                     )
 
         # Method 2: Check service config protocol
-        if protocol_name is None and hasattr(self, "service_config_to_test"):
-            if hasattr(self.service_config_to_test, "protocol") and hasattr(
-                self.service_config_to_test.protocol, "name"
-            ):
-                protocol_name = getattr(
-                    self.service_config_to_test.protocol, "name", None
-                )
-                if hasattr(self, "logger"):
-                    self.logger.debug(
-                        f"Found protocol name from service config: {protocol_name}"
-                    )
-
         # Method 3: Check _original_service_config if available (fallback)
-        if protocol_name is None and hasattr(self, "_original_service_config"):
-            if hasattr(self._original_service_config, "protocol") and hasattr(
-                self._original_service_config.protocol, "name"
-            ):
-                protocol_name = getattr(
-                    self._original_service_config.protocol, "name", None
-                )
-                if hasattr(self, "logger"):
-                    self.logger.debug(
-                        f"Found protocol name from original service config: {protocol_name}"
-                    )
+        for config_attr, source in (
+            ("service_config_to_test", "service config"),
+            ("_original_service_config", "original service config"),
+        ):
+            if protocol_name is not None:
+                break
+            config = getattr(self, config_attr, None)
+            config_protocol = getattr(config, "protocol", None)
+            if (name := getattr(config_protocol, "name", _MISSING)) is not _MISSING:
+                protocol_name = name
+                if logger is not None:
+                    logger.debug("Found protocol name from %s: %s", source, name)
 
         if protocol_name is None:
             protocol_name = "unknown"
-            if hasattr(self, "logger"):
-                self.logger.warning("Could not determine protocol name from any source")
+            if logger is not None:
+                logger.warning("Could not determine protocol name from any source")
 
         self._protocol_name_cache = protocol_name
         return protocol_name
@@ -132,10 +138,7 @@ class IvyProtocolAwareMixin:
         """
         # Get local base path from environment variable or auto-detect
         local_base_path = os.getenv("PANTHER_IVY_LOCAL_BASE_PATH")
-        if local_base_path:
-            base_path = Path(local_base_path)
-        else:
-            base_path = Path(__file__).parent / "protocol-testing"
+        base_path = Path(local_base_path) if local_base_path else _DEFAULT_LOCAL_BASE
 
         protocol_name = self.get_protocol_name()
 
@@ -168,7 +171,36 @@ class IvyProtocolAwareMixin:
             int: Number of environment variables that were set
         """
         protocol_name = self.get_protocol_name()
+        simplified_env_vars = self._build_simplified_env_vars(
+            protocol_name, use_system_models
+        )
+        base_dir = simplified_env_vars["PANTHER_IVY_BASE_DIR"]
 
+        # Apply the environment variables
+        env_vars.update(simplified_env_vars)
+        adapted_count = len(simplified_env_vars)
+
+        if (logger := getattr(self, "logger", None)) is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                for var_name, var_value in simplified_env_vars.items():
+                    logger.debug(
+                        "Set simplified environment variable %s=%s", var_name, var_value
+                    )
+            architecture = "APT" if use_system_models else "standard"
+            logger.info(
+                "Set %s simplified environment variables for %s architecture",
+                adapted_count,
+                architecture,
+            )
+            logger.info("PANTHER_IVY_BASE_DIR=%s", base_dir)
+
+        return adapted_count
+
+    @staticmethod
+    def _build_simplified_env_vars(
+        protocol_name: str, use_system_models: bool
+    ) -> Dict[str, str]:
+        """Build the variable set written by adapt_environment_paths."""
         # Get project root from environment or use default
         project_root = os.getenv("PROJECT_ROOT", "/opt/panther_ivy")
 
@@ -183,8 +215,8 @@ class IvyProtocolAwareMixin:
             base_dir = f"{project_root}/protocol-testing/{protocol_name}"
             apt_path = ""
 
-        # Set the simplified environment variables
-        simplified_env_vars = {
+        # The simplified environment variables
+        return {
             "PANTHER_IVY_BASE_DIR": base_dir,
             "USE_APT_PROTOCOLS": "1" if use_system_models else "0",
             "IS_APT_PATH": apt_path,  # Keep for backward compatibility
@@ -193,22 +225,3 @@ class IvyProtocolAwareMixin:
             "IVY_INCLUDE_PATH": "/opt/panther_ivy/ivy/include/1.7",
             "PANTHER_IVY_ARCHITECTURE": "apt" if use_system_models else "standard",
         }
-
-        # Apply the environment variables
-        adapted_count = 0
-        for var_name, var_value in simplified_env_vars.items():
-            env_vars[var_name] = var_value
-            adapted_count += 1
-            if hasattr(self, "logger"):
-                self.logger.debug(
-                    f"Set simplified environment variable {var_name}={var_value}"
-                )
-
-        if hasattr(self, "logger"):
-            architecture = "APT" if use_system_models else "standard"
-            self.logger.info(
-                f"Set {adapted_count} simplified environment variables for {architecture} architecture"
-            )
-            self.logger.info(f"PANTHER_IVY_BASE_DIR={base_dir}")
-
-        return adapted_count
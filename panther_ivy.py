@@ -153,15 +153,22 @@ class PantherIvyServiceManager(
         which build mode to pass to the Docker builder. The build mode
         controls Z3 compilation flags in build_submodules.py.
 
+        The mode is resolved once and cached, so a single build sees a
+        stable value.
+
         Returns:
-            Build mode string: '', 'debug-asan', 'rel-lto', or 'release-static-pgo'
+            Build mode string: '', 'debug-asan', 'debug-asan-stl', 'rel-lto',
+            'release-thin-lto', 'release-static-pgo', 'release-bolt' or
+            'release-cs-pgo'
         """
-        if hasattr(self, "service_config_to_test"):
-            build_mode = getattr(self.service_config_to_test, "build_mode", None)
-            if build_mode:
-                return build_mode
+        if getattr(self, "_build_mode", None) is None:
+            self._build_mode = self._resolve_build_mode()
+        return self._build_mode
 
-        return ""
+    def _resolve_build_mode(self) -> str:
+        """Read the build mode from the service config, '' when it has none."""
+        config = getattr(self, "service_config_to_test", None)
+        return getattr(config, "build_mode", None) or ""
 
     def get_z3_source(self) -> str:
         """Get the Z3 source from config for Docker image building.
@@ -229,21 +236,20 @@ class PantherIvyServiceManager(
         # Set protocol model paths
         self.protocol = protocol
         self._protocol_name_cache = None
+        self._build_mode = None
+        self._reset_command_caches()
+        self.invalidate_network_cache()
 
         # Initialize protocol-specific data directory for flexible template system
         protocol_name = self._get_protocol_name_from_service_config()
         self.ivy_protocol_data_dir = protocol_name  # e.g., "quic" for QUIC protocol
 
+        use_system_models = getattr(service_config_to_test, "use_system_models", False)
         self.env_protocol_model_path = self.get_protocol_model_path(
-            use_system_models=getattr(
-                service_config_to_test, "use_system_models", False
-            )
+            use_system_models=use_system_models
         )
-
         self.protocol_model_path = self.get_local_protocol_model_path(
-            use_system_models=getattr(
-                service_config_to_test, "use_system_models", False
-            )
+            use_system_models=use_system_models
         )
 
         self.available_tests = AvailableTests.load_tests_from_directory(
@@ -492,9 +498,7 @@ class PantherIvyServiceManager(
         protocol_name = self.get_protocol_name()
 
         # Determine whether to use system models (APT) or protocol models (manual architecture)
-        use_system_models = getattr(
-            self.service_config_to_test.implementation, "use_system_models", False
-        )
+        use_system_models = self._uses_system_models()
         use_apt_protocols = "1" if use_system_models else "0"
 
         # Ensure protocol model paths are available